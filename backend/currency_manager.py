@@ -1,14 +1,20 @@
 import os
 import json
+import threading
 import time
 import requests
 from typing import Optional
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'currency_cache.json')
+RATE_TTL = 86400  # 24 hours
+RETRY_DELAY = 300  # Wait before retrying a failed fetch
 
 class CurrencyManager:
     def __init__(self):
         self._ensure_data_dir()
+        self._lock = threading.Lock()
+        self._fetch_failed_at = 0
+        self.rate_timestamp = 0
         self.rate = self._load_cached_rate()
 
     def _ensure_data_dir(self):
@@ -25,7 +31,8 @@ class CurrencyManager:
                 rate = data.get('rate')
                 
                 # Check if cache is older than 24 hours (86400 seconds)
-                if time.time() - timestamp < 86400:
+                if time.time() - timestamp < RATE_TTL:
+                    self.rate_timestamp = timestamp
                     return rate
         except Exception as e:
             print(f"Error loading currency cache: {e}")
@@ -38,26 +45,37 @@ class CurrencyManager:
         Tries cache first, then API. 
         Returns None if everything fails.
         """
-        if self.rate:
+        if self.rate and time.time() - self.rate_timestamp < RATE_TTL:
+            return self.rate
+
+        # One fetch at a time; concurrent callers reuse its result
+        with self._lock:
+            now = time.time()
+            if self.rate and now - self.rate_timestamp < RATE_TTL:
+                return self.rate
+            # After a failure, serve the stale rate (or None) instead of blocking every caller
+            if now - self._fetch_failed_at < RETRY_DELAY:
+                return self.rate
+
+            # Fetch from API
+            try:
+                response = requests.get("https://api.frankfurter.app/latest?from=USD&to=IDR", timeout=5)
+                if response.status_code == 200:
+                    data = response.json()
+                    rate = data.get("rates", {}).get("IDR")
+                    if rate:
+                        self._save_cache(rate)
+                        return rate
+            except Exception as e:
+                print(f"Error fetching currency rate: {e}")
+
+            self._fetch_failed_at = now
+            # Fallback
             return self.rate
-        
-        # Fetch from API
-        try:
-            response = requests.get("https://api.frankfurter.app/latest?from=USD&to=IDR", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                rate = data.get("rates", {}).get("IDR")
-                if rate:
-                    self._save_cache(rate)
-                    return rate
-        except Exception as e:
-            print(f"Error fetching currency rate: {e}")
-            
-        # Fallback
-        return None
 
     def _save_cache(self, rate: float):
         self.rate = rate
+        self.rate_timestamp = time.time()
         try:
             with open(DATA_FILE, 'w') as f:
                 json.dump({
@@ -67,3 +85,16 @@ class CurrencyManager:
                 }, f)
         except Exception as e:
             print(f"Error saving currency cache: {e}")
+
+
+_shared_manager: Optional[CurrencyManager] = None
+_shared_manager_lock = threading.Lock()
+
+def get_currency_manager() -> CurrencyManager:
+    """Returns the process-wide CurrencyManager so the cached rate is shared."""
+    global _shared_manager
+    if _shared_manager is None:
+        with _shared_manager_lock:
+            if _shared_manager is None:
+                _shared_manager = CurrencyManager()
+    return _shared_manager
@@ -0,0 +1,36 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transient upstream statuses worth retrying (rate limits, gateway hiccups)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_size: int = 16, retries: int = 0) -> requests.Session:
+    """
+    Session whose keep-alive pool can serve `pool_size` concurrent requests,
+    so repeated calls to the same host skip the TCP/TLS handshake.
+
+    Args:
+        pool_size: Maximum pooled connections per host
+        retries: Retries on connection/read errors and transient statuses
+            (RETRY_STATUSES) for idempotent requests, with backoff
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.3,
+        status_forcelist=RETRY_STATUSES,
+        raise_on_status=False
+    ) if retries else 0
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -3,23 +3,25 @@ from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-import json
 import os
+import requests
 from dotenv import load_dotenv
 from fastapi.staticfiles import StaticFiles
+from openai import OpenAI
 
 from verifier import BookVerifier
-from summarizer import BookSummarizer
+from summarizer import BookSummarizer, shutdown_http
 from config_manager import ConfigManager
-from storage_manager import StorageManager
+from storage_manager import get_storage_manager
 from notion_manager import NotionManager
+from search_service import BraveSearchClient
 import summarizer_utils
 
 load_dotenv()
 
 app = FastAPI(title="Pustaka+ API")
 config_manager = ConfigManager()
-storage_manager = StorageManager()
+storage_manager = get_storage_manager()
 
 # Ensure covers directory exists for static mounting
 COVERS_DIR = os.path.join(os.path.dirname(__file__), 'covers')
@@ -37,6 +39,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Make sure change log writes still waiting on a coalesced fsync reach disk
+    storage_manager.flush()
+    await shutdown_http()
+
 
 class VerificationRequest(BaseModel):
     isbn: Optional[str] = None
@@ -149,6 +157,15 @@ class SummarizationRequest(BaseModel):
     critic_model: Optional[str] = None
     max_iterations: Optional[int] = 3
     target_score: Optional[int] = 90
+    bypass_cache: Optional[bool] = False
+
+class BatchSummarizationRequest(BaseModel):
+    books: List[List[Dict]]
+    api_key: Optional[str] = None
+    model: Optional[str] = None
+    provider: Optional[str] = "OpenRouter"
+    base_url: Optional[str] = None
+    concurrency: Optional[int] = 4
     
 class SynthesisRequest(BaseModel):
     summary_ids: List[str]
@@ -165,8 +182,7 @@ class ElaborationRequest(BaseModel):
     provider: Optional[str] = "OpenRouter"
     base_url: Optional[str] = None
 
-@app.post("/api/summarize")
-async def summarize_book(req: SummarizationRequest):
+def _summarization_summarizer(req) -> BookSummarizer:
     # Determine API Key & Provider from request or config
     config = config_manager.load_config()
     
@@ -179,13 +195,17 @@ async def summarize_book(req: SummarizationRequest):
     if provider == "Ollama":
         model = req.model or config.get("ollama_model", "llama3")
 
-    summarizer = BookSummarizer(
+    return BookSummarizer(
         api_key=api_key, 
         model_name=model, 
         provider=provider, 
         base_url=base_url,
         search_config=config  # Pass full config for search
     )
+
+@app.post("/api/summarize")
+async def summarize_book(req: SummarizationRequest):
+    summarizer = _summarization_summarizer(req)
     
     if req.enhance_quality:
         return StreamingResponse(
@@ -205,10 +225,18 @@ async def summarize_book(req: SummarizationRequest):
         )
 
     return StreamingResponse(
-        summarizer.summarize_stream(req.metadata, partial_content=req.partial_content),
+        summarizer.summarize_stream(req.metadata, partial_content=req.partial_content, use_cache=not req.bypass_cache),
         media_type="text/event-stream"
     )
 
+@app.post("/api/summarize/batch")
+async def summarize_books(req: BatchSummarizationRequest):
+    # Non-streaming: one result per book, in request order
+    if not req.books:
+        raise HTTPException(status_code=400, detail="No books provided")
+    summarizer = _summarization_summarizer(req)
+    return await summarizer.summarize_batch(req.books, concurrency=min(max(req.concurrency or 4, 1), 16))
+
 @app.post("/api/synthesize")
 async def synthesize_summaries(req: SynthesisRequest):
     data = storage_manager.get_all_summaries()
@@ -282,7 +310,7 @@ async def synthesize_summaries(req: SynthesisRequest):
             async for update in summarizer.summarize_synthesize(title, author, genre, year, drafts, diversity_analysis=diversity_analysis):
                 if "error" in update:
                     print(f"[SYNTHESIS_STREAM_ERROR] {update['error']}")
-                    yield f"data: {json.dumps(update)}\n\n"
+                    yield summarizer_utils.sse_event(update)
                     break
                 
                 # Prepare data to yield
@@ -295,18 +323,17 @@ async def synthesize_summaries(req: SynthesisRequest):
                     yield_data["source_draft_count"] = len(drafts)
                     yield_data["diversity_analysis"] = diversity_analysis
                 
-                yield f"data: {json.dumps(yield_data)}\n\n"
+                yield summarizer_utils.sse_event(yield_data)
         except Exception as e:
             print(f"[SYNTHESIS_CRASH] Critical error in generator: {str(e)}")
             import traceback
             traceback.print_exc()
-            yield f"data: {json.dumps({'error': f'Server Crash: {str(e)}'})}\n\n"
+            yield summarizer_utils.sse_event({'error': f'Server Crash: {str(e)}'})
             
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
 
-@app.post("/api/elaborate")
-def elaborate_text(req: ElaborationRequest):
+def _elaboration_summarizer(req: ElaborationRequest) -> BookSummarizer:
     # Determine API Key & Provider from request or config
     config = config_manager.load_config()
     
@@ -319,15 +346,26 @@ def elaborate_text(req: ElaborationRequest):
     if provider == "Ollama":
         model = req.model or config.get("ollama_model", "llama3")
 
-    summarizer = BookSummarizer(
+    return BookSummarizer(
         api_key=api_key, 
         model_name=model, 
         provider=provider, 
         base_url=base_url
     )
-    
+
+@app.post("/api/elaborate")
+def elaborate_text(req: ElaborationRequest):
+    summarizer = _elaboration_summarizer(req)
     return summarizer.elaborate(req.selection, req.query, req.context, req.history)
 
+@app.post("/api/elaborate/stream")
+async def elaborate_text_stream(req: ElaborationRequest):
+    summarizer = _elaboration_summarizer(req)
+    return StreamingResponse(
+        summarizer.elaborate_stream(req.selection, req.query, req.context, req.history),
+        media_type="text/event-stream"
+    )
+
 
 @app.post("/api/models")
 def list_models(req: Dict):
@@ -339,7 +377,6 @@ def list_models(req: Dict):
         if not api_key:
              raise HTTPException(status_code=400, detail="OpenRouter API Key is required")
         try:
-            from openai import OpenAI
             client = OpenAI(
                 base_url="https://openrouter.ai/api/v1",
                 api_key=api_key,
@@ -362,7 +399,6 @@ def list_models(req: Dict):
         
         api_key = api_key.strip() # Ensure Groq key is also trimmed
         try:
-            from openai import OpenAI
             client = OpenAI(
                 base_url="https://api.groq.com/openai/v1",
                 api_key=api_key
@@ -376,7 +412,6 @@ def list_models(req: Dict):
             raise HTTPException(status_code=401, detail=f"Groq Error: {str(e)}")
     
     elif provider == "Ollama":
-        import requests
         url = f"{base_url or 'http://localhost:11434'}/api/tags"
         try:
             response = requests.get(url, timeout=5)
@@ -401,7 +436,6 @@ def test_search_api(req: Dict):
         raise HTTPException(status_code=400, detail="Brave API key is required for testing")
     
     try:
-        from search_service import BraveSearchClient
         client = BraveSearchClient(api_key=brave_api_key, timeout=5)
         
         # Test with a simple query
@@ -447,6 +481,19 @@ def save_summary(req: SaveSummaryRequest):
         "metadata": req.metadata
     })
 
+@app.post("/api/save/batch")
+def save_summaries(reqs: List[SaveSummaryRequest]):
+    return storage_manager.save_summaries([
+        {
+            "title": req.title,
+            "author": req.author,
+            "summary_content": req.summary_content,
+            "usage_stats": req.usage_stats,
+            "metadata": req.metadata
+        }
+        for req in reqs
+    ])
+
 @app.delete("/api/saved/{summary_id}")
 def delete_summary(summary_id: str):
     success = storage_manager.delete_summary(summary_id)
@@ -4,6 +4,20 @@ import re
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from http_utils import create_session
+
+# Shared keep-alive pool for api.notion.com (page creation is a POST, so no retries)
+_HTTP = create_session(4)
+
+# Markdown patterns used while converting summaries, compiled once
+_WIKILINK_RE = re.compile(r'\[\[(.*?)\]\]')
+_INVISIBLE_CHARS_RE = re.compile(r'[\u200b\u200c\u200d\u200e\u200f\ufeff]')
+_HEADING_RE = re.compile(r'^(#+)\s+(.+)$')
+_BULLET_RE = re.compile(r'^[\-\*\+]\s+(.*)')
+_DIVIDER_RE = re.compile(r'^[\-\*_]{3,}$')
+# Urutan penting: Bold+Italic (***), Bold (**), Italic (*)
+_EMPHASIS_RE = re.compile(r'(\*\*\*.*?\*\*\*|\*\*.*?\*\*|\*.*?\*|[^\*]+)')
+
 class NotionManager:
     def __init__(self, api_key: str, database_id: str):
         self.api_key = api_key
@@ -102,7 +116,7 @@ class NotionManager:
         }
 
         try:
-            response = requests.post(url, headers=self.headers, json=payload)
+            response = _HTTP.post(url, headers=self.headers, json=payload)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -119,21 +133,21 @@ class NotionManager:
         content = content.replace('\r\n', '\n').replace('\r', '\n')
         
         # 2. Bersihkan marker internal Pustaka+ (intel-synth) sebelum parsing
-        content = re.sub(r'\[\[(.*?)\]\]', r'\1', content)
+        content = _WIKILINK_RE.sub(r'\1', content)
         
         lines = content.split('\n')
         
         for line in lines:
             # 3. Clean line carefully: strip whitespace and invisible control characters
             line = line.strip()
-            line = re.sub(r'[\u200b\u200c\u200d\u200e\u200f\ufeff]', '', line)
+            line = _INVISIBLE_CHARS_RE.sub('', line)
             
             if not line:
                 continue
 
             # 4. Headings: Deteksi tanda pagar di awal baris
             # Kita gunakan regex yang sangat eksplisit untuk menangkap tanda pagar
-            h_match = re.search(r'^(#+)\s+(.+)$', line)
+            h_match = _HEADING_RE.search(line)
             if h_match:
                 level = len(h_match.group(1))
                 text_content = h_match.group(2).strip()
@@ -152,7 +166,7 @@ class NotionManager:
                     continue
             
             # 5. Bullet Lists: Deteksi -, *, atau + di awal baris
-            list_match = re.match(r'^[\-\*\+]\s+(.*)', line)
+            list_match = _BULLET_RE.match(line)
             if list_match:
                 text_content = list_match.group(1).strip()
                 # Hindari heading di dalam list (bersihkan jika ada)
@@ -178,7 +192,7 @@ class NotionManager:
                 continue
             
             # 7. Horizontal Rule: Deteksi baris yang hanya berisi ---, ***, atau ___
-            if re.match(r'^[\-\*_]{3,}$', line):
+            if _DIVIDER_RE.match(line):
                 blocks.append({
                     "object": "block",
                     "type": "divider",
@@ -217,13 +231,11 @@ class NotionManager:
             return []
 
         # Bersihkan marker internal jika masih ada
-        text = re.sub(r'\[\[(.*?)\]\]', r'\1', text)
+        text = _WIKILINK_RE.sub(r'\1', text)
         
         parts = []
         # Regex untuk mendeteksi bold, italic, atau teks biasa (Greedy)
-        # Urutan penting: Bold+Italic (***), Bold (**), Italic (*)
-        pattern = r'(\*\*\*.*?\*\*\*|\*\*.*?\*\*|\*.*?\*|[^\*]+)'
-        segments = re.findall(pattern, text)
+        segments = _EMPHASIS_RE.findall(text)
         
         for seg in segments:
             if seg.startswith('***') and seg.endswith('***'):
@@ -12,7 +12,7 @@ NOTE: This file is now a facade for the modularized prompts package.
 
 from prompts import *
 
-__version__ = "2.0.0"
+__version__ = "2.2.0"
 __improvements__ = [
     "Added concrete examples for all major rules",
     "Implemented priority hierarchy for conflict resolution",
@@ -22,5 +22,7 @@ __improvements__ = [
     "Improved linguistic guidelines with naturalness examples",
     "Added surgical editing protocol for refinement",
     "Included scoring rubric for critic evaluation",
-    "Modularized structure into backend/prompts package"
+    "Modularized structure into backend/prompts package",
+    "Condensed rule block (CORE_RULES_COMPACT) for free-tier models",
+    "Descriptions and source fragments clipped at paragraph, sentence or word breaks"
 ]
\ No newline at end of file
@@ -1,7 +1,8 @@
-from .constants import STANDARD_SECTIONS, SECTION_KEYWORDS, NAME_MAPPINGS
+from .constants import STANDARD_SECTIONS, SECTION_KEYWORDS, SECTION_SYNTHESIS_HINTS, NAME_MAPPINGS
 from .policies import (
     PRIORITY_HIERARCHY,
     CORE_RULES_WITH_EXAMPLES,
+    CORE_RULES_COMPACT,
     VALIDATION_CHECKLIST,
     ESCAPE_HATCH_PROTOCOL,
     EPISTEMIC_CONTROL_POLICY
@@ -18,9 +19,11 @@ from .builders import (
 __all__ = [
     "STANDARD_SECTIONS",
     "SECTION_KEYWORDS",
+    "SECTION_SYNTHESIS_HINTS",
     "NAME_MAPPINGS",
     "PRIORITY_HIERARCHY",
     "CORE_RULES_WITH_EXAMPLES",
+    "CORE_RULES_COMPACT",
     "VALIDATION_CHECKLIST",
     "ESCAPE_HATCH_PROTOCOL",
     "EPISTEMIC_CONTROL_POLICY",
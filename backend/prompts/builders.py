@@ -1,6 +1,7 @@
 from .policies import (
     PRIORITY_HIERARCHY,
     CORE_RULES_WITH_EXAMPLES,
+    CORE_RULES_COMPACT,
     EPISTEMIC_CONTROL_POLICY,
     ESCAPE_HATCH_PROTOCOL,
     VALIDATION_CHECKLIST
@@ -11,24 +12,20 @@ from .templates import CORE_STRUCTURE_PROMPT
 # ENHANCED PROMPT BUILDERS
 # =========================================================
 
-def build_summarize_prompt(title, author, genre, year, context, source, partial=None, search_context=None):
-    """Enhanced version with examples and hierarchy"""
-    intro = f"""
-<document_metadata>
-Title         : {title}
-Author        : {author}
-Published Year: {year}
-Genre/Category: {genre}
-Data Source   : {source}
-Description   : {context[:500] if context else "[Not available]"}
-</document_metadata>
-
-{PRIORITY_HIERARCHY}
+# Policy preamble shared by every builder, joined once at import time
+_POLICY_BLOCK = f"""{PRIORITY_HIERARCHY}
 {CORE_RULES_WITH_EXAMPLES}
 {EPISTEMIC_CONTROL_POLICY}
-{ESCAPE_HATCH_PROTOCOL}
+{ESCAPE_HATCH_PROTOCOL}"""
 
-<role_definition>
+# The critic audits against the rules but does not need the escape hatch protocol
+_CRITIC_POLICY_BLOCK = f"""{PRIORITY_HIERARCHY}
+{CORE_RULES_WITH_EXAMPLES}
+{EPISTEMIC_CONTROL_POLICY}"""
+
+# Static blocks of the summarize prompt, joined once at import time.
+# Only the metadata header and search context change between calls.
+_SUMMARIZE_ROLE = """<role_definition>
 You are a PRINCIPAL INTELLIGENCE ANALYST specializing in high-density text compression
 with strict epistemic discipline. Your output will be used for scholarly reference.
 
@@ -37,11 +34,22 @@ Core Competencies:
 - Structural clarity: logical flow over narrative color
 - Epistemic humility: acknowledge uncertainty explicitly
 - Linguistic precision: clarity > language purity
-</role_definition>
+</role_definition>"""
 
-{search_context if search_context else ""}
+_SUMMARIZE_POLICY_BLOCK = f"""{_POLICY_BLOCK}
 
-<task>
+{_SUMMARIZE_ROLE}"""
+
+# Same policy with the worked rule examples condensed, for free-tier models with
+# small context windows (the examples are about a third of the summarize prompt)
+_SUMMARIZE_POLICY_BLOCK_COMPACT = f"""{PRIORITY_HIERARCHY}
+{CORE_RULES_COMPACT}
+{EPISTEMIC_CONTROL_POLICY}
+{ESCAPE_HATCH_PROTOCOL}
+
+{_SUMMARIZE_ROLE}"""
+
+_SUMMARIZE_TASK_BLOCK = f"""<task>
 Analyze the provided text and generate a structured analytical summary following
 the template below. Prioritize epistemic accuracy over stylistic preferences.
 </task>
@@ -50,9 +58,9 @@ the template below. Prioritize epistemic accuracy over stylistic preferences.
 {CORE_STRUCTURE_PROMPT}
 </output_structure>
 
-{VALIDATION_CHECKLIST}
+{VALIDATION_CHECKLIST}"""
 
-<final_reminder>
+_SUMMARIZE_FINAL_REMINDER = """<final_reminder>
 Before submitting:
 1. Run through validation checklist
 2. Verify no fabricated content
@@ -61,6 +69,50 @@ Before submitting:
 5. Confirm first paragraph is 100-150 words with NO bullet points
 </final_reminder>
 """
+
+# Everything before the per-book metadata is byte-identical across calls, so providers
+# with automatic prefix caching (OpenAI, DeepSeek, Gemini via OpenRouter) can reuse it
+_SUMMARIZE_PREFIX = f"""{_SUMMARIZE_POLICY_BLOCK}
+
+{_SUMMARIZE_TASK_BLOCK}
+"""
+
+_SUMMARIZE_PREFIX_COMPACT = f"""{_SUMMARIZE_POLICY_BLOCK_COMPACT}
+
+{_SUMMARIZE_TASK_BLOCK}
+"""
+
+
+def _clip_fragment(text, limit):
+    """Cuts `text` to at most `limit` chars, backing up to the last paragraph, sentence
+    or word break in the second half so a fragment never ends mid-sentence or mid-word.
+    A cut is marked with "...", which replaces any period the kept text ends with."""
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    for sep in ("\n\n", "\n", ". ", " "):
+        cut = head.rfind(sep, limit // 2)
+        if cut != -1:
+            return head[:cut].rstrip().rstrip(".") + "..."
+    return head + "..."
+
+
+def build_summarize_prompt(title, author, genre, year, context, source, partial=None, search_context=None, compact=False):
+    """Enhanced version with examples and hierarchy (compact=True condenses the rule examples)"""
+    # Static instructions lead; book metadata and search context follow them
+    intro = f"""{_SUMMARIZE_PREFIX_COMPACT if compact else _SUMMARIZE_PREFIX}
+<document_metadata>
+Title         : {title}
+Author        : {author}
+Published Year: {year}
+Genre/Category: {genre}
+Data Source   : {source}
+Description   : {_clip_fragment(context, 500) if context else "[Not available]"}
+</document_metadata>
+
+{search_context if search_context else ""}
+
+{_SUMMARIZE_FINAL_REMINDER}"""
     
     if partial:
         intro += f"""
@@ -83,20 +135,11 @@ Continue from: [Identify and state the continuation point]
     return intro
 
 
-def build_judge_prompt(title, author, genre, year, drafts):
-    """Enhanced with conflict resolution"""
-    valid_drafts = [d.strip() for d in drafts if d and str(d).strip()]
-    formatted = "\n\n".join(
-        [f"═══ DRAFT CANDIDATE {i+1} ═══\n{d}" for i, d in enumerate(valid_drafts)]
-    )
-
-    return f"""
+# Everything but the drafts is fixed, so it is joined once at import time
+_JUDGE_HEAD = f"""
 <role>SENIOR CHIEF EDITOR — Final Synthesis</role>
 
-{PRIORITY_HIERARCHY}
-{CORE_RULES_WITH_EXAMPLES}
-{EPISTEMIC_CONTROL_POLICY}
-{ESCAPE_HATCH_PROTOCOL}
+{_POLICY_BLOCK}
 
 <task>
 Synthesize multiple draft candidates into ONE epistemically sound Master Summary.
@@ -116,7 +159,9 @@ If drafts disagree:
 </task>
 
 <input_drafts>
-{formatted}
+"""
+
+_JUDGE_TAIL = f"""
 </input_drafts>
 
 <output_structure_requirement>
@@ -127,6 +172,44 @@ If drafts disagree:
 """
 
 
+def build_judge_prompt(title, author, genre, year, drafts):
+    """Enhanced with conflict resolution"""
+    # One strip per draft: it both filters blanks and yields the text to embed
+    valid_drafts = [s for d in drafts if d and (s := str(d).strip())]
+    formatted = "\n\n".join(
+        [f"═══ DRAFT CANDIDATE {i+1} ═══\n{d}" for i, d in enumerate(valid_drafts)]
+    )
+
+    return f"{_JUDGE_HEAD}{formatted}{_JUDGE_TAIL}"
+
+
+# Identical for every section of every book, so it leads the prompt: providers with
+# automatic prefix caching (and llama.cpp's KV reuse) can skip recomputing it
+_SECTION_SYNTHESIS_PREFIX = f"""
+<role>SECTION EDITOR — Focused Synthesis</role>
+
+{_POLICY_BLOCK}
+
+<synthesis_protocol>
+1. Extract all relevant claims from source fragments
+2. Verify consistency across fragments
+3. Construct logical narrative with epistemic tagging
+4. If insufficient data:
+   - Use linguistic hedging
+   - Apply scope limiters
+   - Add [Insufficient Data] marker if unavoidable
+5. DO NOT fabricate specifics
+</synthesis_protocol>
+
+<output_requirements>
+- Indonesian academic prose ONLY (no headers, no English paragraphs)
+- All interpretative constructs must be labeled
+- No generic statements without specific grounding
+- Length: responsive to content availability (quality > quota)
+</output_requirements>
+"""
+
+
 def build_section_synthesis_prompt(name, contents, t, a, g, y, dc, full, hints):
     """Enhanced with uncertainty protocol"""
     valid_contents = [c for c in contents if c and str(c).strip()]
@@ -134,21 +217,14 @@ def build_section_synthesis_prompt(name, contents, t, a, g, y, dc, full, hints):
 
     fmt = "\n\n".join(
         [
-            f"═══ SOURCE FRAGMENT {i+1} ═══\n{c[:limit_char]}{'...' if len(c) > limit_char else ''}"
+            f"═══ SOURCE FRAGMENT {i+1} ═══\n{_clip_fragment(c, limit_char)}"
             for i, c in enumerate(valid_contents)
         ]
     )
 
     hint = hints.get(name, "Synthesize with maximal epistemic discipline.")
 
-    return f"""
-<role>SECTION EDITOR — Focused Synthesis</role>
-
-{PRIORITY_HIERARCHY}
-{CORE_RULES_WITH_EXAMPLES}
-{EPISTEMIC_CONTROL_POLICY}
-{ESCAPE_HATCH_PROTOCOL}
-
+    return f"""{_SECTION_SYNTHESIS_PREFIX}
 <context>
 Book: "{t}" by {a}
 Genre: {g} | Year: {y}
@@ -165,35 +241,14 @@ Genre: {g} | Year: {y}
 <source_materials>
 {fmt if valid_contents else "[NO SOURCE AVAILABLE — APPLY ESCAPE HATCH PROTOCOL]"}
 </source_materials>
-
-<synthesis_protocol>
-1. Extract all relevant claims from source fragments
-2. Verify consistency across fragments
-3. Construct logical narrative with epistemic tagging
-4. If insufficient data:
-   - Use linguistic hedging
-   - Apply scope limiters
-   - Add [Insufficient Data] marker if unavoidable
-5. DO NOT fabricate specifics
-</synthesis_protocol>
-
-<output_requirements>
-- Indonesian academic prose ONLY (no headers, no English paragraphs)
-- All interpretative constructs must be labeled
-- No generic statements without specific grounding
-- Length: responsive to content availability (quality > quota)
-</output_requirements>
 """
 
 
-def build_critic_prompt(title, author, draft):
-    """Enhanced with specific failure modes"""
-    return f"""
+# Only the audited draft varies
+_CRITIC_HEAD = f"""
 <role>ACADEMIC PEER REVIEWER — Epistemic Audit</role>
 
-{PRIORITY_HIERARCHY}
-{CORE_RULES_WITH_EXAMPLES}
-{EPISTEMIC_CONTROL_POLICY}
+{_CRITIC_POLICY_BLOCK}
 
 <task>
 Audit draft for structural, analytical, and epistemic violations.
@@ -223,19 +278,21 @@ ANALYTICAL:
 </task>
 
 <draft_to_evaluate>
-{draft[:8000]}
+"""
+
+_CRITIC_TAIL = """
 </draft_to_evaluate>
 
 <output_schema>
 Return ONLY valid JSON:
-{{
+{
   "score": [integer 0-100, where 100 = perfect compliance],
   "structural_issues": ["specific violation with location"],
   "epistemic_issues": ["specific violation with location"],
   "linguistic_issues": ["specific violation with location"],
   "analytical_issues": ["specific violation with location"],
   "fixes": ["concrete corrective instruction, prioritized by severity"]
-}}
+}
 
 SCORING RUBRIC:
 90-100: Minor issues only (style, word choice)
@@ -246,18 +303,16 @@ SCORING RUBRIC:
 """
 
 
-def build_refiner_prompt(title, author, draft, issues, fixes):
-    """Enhanced with surgical editing protocol"""
-    issues_block = "\n".join([f"- {i}" for i in issues]) if issues else "[No issues reported]"
-    fixes_block = "\n".join([f"+ {f}" for f in fixes]) if fixes else "[No fixes required]"
+def build_critic_prompt(title, author, draft):
+    """Enhanced with specific failure modes"""
+    return f"{_CRITIC_HEAD}{draft[:8000]}{_CRITIC_TAIL}"
 
-    return f"""
+
+# Only the critique and the draft vary
+_REFINER_HEAD = f"""
 <role>SENIOR REVISIONIST — Surgical Correction</role>
 
-{PRIORITY_HIERARCHY}
-{CORE_RULES_WITH_EXAMPLES}
-{EPISTEMIC_CONTROL_POLICY}
-{ESCAPE_HATCH_PROTOCOL}
+{_POLICY_BLOCK}
 
 <task>
 Apply corrections to achieve full epistemic and structural compliance.
@@ -272,14 +327,9 @@ REVISION PROTOCOL:
 
 <critique_report>
 ISSUES IDENTIFIED:
-{issues_block}
-
-REQUIRED FIXES (in priority order):
-{fixes_block}
-</critique_report>
+"""
 
-<original_draft>
-{draft}
+_REFINER_TAIL = f"""
 </original_draft>
 
 <revision_instructions>
@@ -300,3 +350,18 @@ After revision, verify:
 4. Epistemic accuracy preserved
 </final_check>
 """
+
+
+def build_refiner_prompt(title, author, draft, issues, fixes):
+    """Enhanced with surgical editing protocol"""
+    issues_block = "\n".join([f"- {i}" for i in issues]) if issues else "[No issues reported]"
+    fixes_block = "\n".join([f"+ {f}" for f in fixes]) if fixes else "[No fixes required]"
+
+    return f"""{_REFINER_HEAD}{issues_block}
+
+REQUIRED FIXES (in priority order):
+{fixes_block}
+</critique_report>
+
+<original_draft>
+{draft}{_REFINER_TAIL}"""
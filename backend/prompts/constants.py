@@ -24,6 +24,13 @@ SECTION_KEYWORDS = {
     ]
 }
 
+# Per-section merge guidance passed to build_section_synthesis_prompt
+SECTION_SYNTHESIS_HINTS = {
+    "EXECUTIVE SUMMARY & CORE THESIS": "Integrasikan Ringkasan Inti, Tesis Utama & Argumen, dan Kutipan Ikonik menjadi satu bagian yang kohesif.",
+    "ANALYTICAL FRAMEWORK": "Gabungkan Glosarium Terminologi dan Blueprint Penalaran (Celah, Metode, Konvergensi) di sini.",
+    "MARKET & INTELLECTUAL POSITIONING": "Fokus pada Kompetitor Langsung, USP, dan Warisan Intelektual."
+}
+
 NAME_MAPPINGS = {
     "EXECUTIVE ANALYTICAL BRIEF": "EXECUTIVE SUMMARY & CORE THESIS",
     "CORE THESIS & KEY ARGUMENTS": "EXECUTIVE SUMMARY & CORE THESIS",
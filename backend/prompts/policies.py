@@ -160,6 +160,33 @@ export pessimism, meskipun penulis tidak mengklaim genealogi ini secara eksplisi
 </core_rules_with_examples>
 """
 
+# =========================================================
+# CORE RULES — COMPACT (for models with tight context windows)
+# =========================================================
+
+CORE_RULES_COMPACT = """
+<core_rules>
+RULE 1 — HEADER LANGUAGE: Section headers in English, UPPERCASE.
+  ✅ ## 1. EXECUTIVE SUMMARY & CORE THESIS   ❌ ## 1. RINGKASAN EKSEKUTIF & TESIS INTI
+
+RULE 2 — FIRST PARAGRAPH (Section 1): one prose paragraph, 100-150 words, no bullet
+  points, no promotional tone. State the core argument, method, and scope.
+
+RULE 3 — EPISTEMIC TAGGING: every analytical concept signals its origin.
+  ✅ Penulis mengidentifikasi "regulatory capture" (textual) sebagai mekanisme utama...
+  ✅ Konsep "embedded liberalism" [Interpretative Construct] mendasari argumentasi...
+
+RULE 4 — HYBRID LANGUAGE: Indonesian prose; keep English technical terms where a
+  translation loses precision. No full English sentences, no forced translations.
+
+RULE 5 — UNCERTAINTY: hedge ("data mengindikasikan"), limit scope, attribute to method.
+  No causal claim without a mechanism ("X berkontribusi pada Y melalui mekanisme Z").
+
+RULE 6 — GENEALOGICAL CLAIMS: only with explicit citation, otherwise label as
+  [Speculative Comparison] or [Interpretative Positioning].
+</core_rules>
+"""
+
 # =========================================================
 # VALIDATION CHECKLIST (Machine-Readable)
 # =========================================================
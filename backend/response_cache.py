@@ -0,0 +1,95 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import orjson
+
+CACHE_DB = os.path.join(os.path.dirname(__file__), 'data', 'llm_cache.db')
+DEFAULT_TTL = 7 * 86400  # 7 days
+
+
+class ResponseCache:
+    """
+    Content-addressed store of finished LLM responses, so summarizing the same
+    book with the same model and prompt version skips the provider call entirely.
+    """
+
+    def __init__(self, path: str = CACHE_DB):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, response BLOB NOT NULL, expires_at INTEGER NOT NULL)"
+            )
+            # Drop expired rows once at startup instead of on every lookup
+            self._conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (int(time.time()),))
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(**parts) -> str:
+        """
+        Hash the request parts into a stable cache key.
+
+        Args:
+            **parts: JSON-serializable values that fully determine the response
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return hashlib.sha256(orjson.dumps(parts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Returns the cached response for `key`, or None if missing or expired."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = ? AND expires_at >= ?",
+                    (key, int(time.time()))
+                ).fetchone()
+            return orjson.loads(row[0]) if row else None
+        except (sqlite3.Error, orjson.JSONDecodeError) as e:
+            print(f"[CACHE_WARNING] Response cache read failed: {e}")
+            return None
+
+    def set(self, key: str, response: Dict, ttl: int = DEFAULT_TTL):
+        """
+        Stores a response under `key`.
+
+        Args:
+            key: Key from make_key()
+            response: JSON-serializable response dict
+            ttl: Seconds until the entry expires
+        """
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, expires_at) VALUES (?, ?, ?)",
+                    (key, orjson.dumps(response), int(time.time()) + ttl)
+                )
+                self._conn.commit()
+        except (sqlite3.Error, TypeError) as e:
+            print(f"[CACHE_WARNING] Response cache write failed: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide ResponseCache, opened on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
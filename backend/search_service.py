@@ -1,9 +1,15 @@
+import concurrent.futures
 import requests
 import time
 import re
-from typing import Dict, List, Optional, Tuple
-from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+from threading import BoundedSemaphore
 
+from http_utils import create_session
+
+
+# Host part of a result URL, for compact reference labels
+_DOMAIN_RE = re.compile(r'https?://(?:www\.)?([^/]+)')
 
 # List of domains to exclude from search results to ensure relevance
 EXCLUDED_DOMAINS = [
@@ -33,15 +39,29 @@ RELEVANCE_KEYWORDS = [
     "inti sari"
 ]
 
+# Upper bound on simultaneous requests per search client (and books per batch)
+MAX_CONCURRENT_REQUESTS = 8
+
+# Brave's free tier allows 1 request/second, so Brave calls stay one at a time
+# across all concurrent users; parallel calls would only come back as 429s
+BRAVE_MAX_CONCURRENT_REQUESTS = 1
+
+
+class BraveSearchError(Exception):
+    """Raised when a Brave Search request cannot be completed"""
+    pass
+
 
 class BraveSearchClient:
     """Client for Brave Search API integration"""
     
-    def __init__(self, api_key: Optional[str] = None, timeout: int = 10):
+    def __init__(self, api_key: Optional[str] = None, timeout: int = 10,
+                 max_concurrency: int = BRAVE_MAX_CONCURRENT_REQUESTS):
         self.api_key = api_key
         self.timeout = timeout
         self.base_url = "https://api.search.brave.com/res/v1/web/search"
-        self._lock = Lock()
+        self._session = create_session(max_concurrency)
+        self._slots = BoundedSemaphore(max_concurrency)
     
     def search(self, query: str, count: int = 5) -> Dict:
         """
@@ -54,8 +74,32 @@ class BraveSearchClient:
         Returns:
             Dict with search results or error
         """
+        try:
+            results = list(self.iter_results(query, count))
+        except BraveSearchError as e:
+            return {"error": str(e), "results": []}
+        
+        return {
+            "results": results,
+            "total": len(results),
+            "query": query
+        }
+    
+    def iter_results(self, query: str, count: int = 5) -> Iterator[Dict]:
+        """
+        Yield Brave web results parsed from the (fully buffered) response body.
+        
+        Args:
+            query: Search query string
+            count: Number of results to return (max 20)
+            
+        Raises:
+            BraveSearchError: If the API key is missing or the request fails
+        """
         if not self.api_key:
-            return {"error": "Brave API key not configured", "results": []}
+            raise BraveSearchError("Brave API key not configured")
+        
+        count = min(count, 20)  # Max 20 per API docs
         
         headers = {
             "Accept": "application/json",
@@ -65,57 +109,62 @@ class BraveSearchClient:
         
         params = {
             "q": query,
-            "count": min(count, 20)  # Max 20 per API docs
+            "count": count
         }
         
         try:
-            with self._lock:
-                response = requests.get(
+            with self._slots:
+                response = self._session.get(
                     self.base_url,
                     headers=headers,
                     params=params,
                     timeout=self.timeout
                 )
             
-            if response.status_code == 200:
-                data = response.json()
-                results = []
+            with response:
+                if response.status_code == 401:
+                    raise BraveSearchError("Invalid Brave API key")
+                elif response.status_code == 429:
+                    raise BraveSearchError("Rate limit exceeded")
+                elif response.status_code != 200:
+                    raise BraveSearchError(f"API error: {response.status_code}")
                 
-                # Extract web results
-                for item in data.get("web", {}).get("results", []):
-                    results.append({
-                        "title": item.get("title", ""),
-                        "snippet": item.get("description", ""),
-                        "url": item.get("url", ""),
-                        "relevance_score": 1.0  # Brave doesn't provide scores
-                    })
+                items = response.json().get("web", {}).get("results", [])
                 
-                return {
-                    "results": results,
-                    "total": len(results),
-                    "query": query
-                }
-            
-            elif response.status_code == 401:
-                return {"error": "Invalid Brave API key", "results": []}
-            elif response.status_code == 429:
-                return {"error": "Rate limit exceeded", "results": []}
-            else:
-                return {"error": f"API error: {response.status_code}", "results": []}
+                # Extract web results
+                for item in items:
+                    try:
+                        yield {
+                            "title": item["title"],
+                            "snippet": item["description"],
+                            "url": item["url"],
+                            "relevance_score": 1.0  # Brave doesn't provide scores
+                        }
+                    except KeyError:
+                        # Partial result: successful responses normally carry all three keys
+                        yield {
+                            "title": item.get("title", ""),
+                            "snippet": item.get("description", ""),
+                            "url": item.get("url", ""),
+                            "relevance_score": 1.0
+                        }
                 
+        except BraveSearchError:
+            raise
         except requests.exceptions.Timeout:
-            return {"error": "Search timeout", "results": []}
+            raise BraveSearchError("Search timeout")
         except Exception as e:
-            return {"error": f"Search failed: {str(e)}", "results": []}
+            raise BraveSearchError(f"Search failed: {str(e)}")
 
 
 class WikipediaSearchClient:
     """Client for Wikipedia API integration"""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, max_concurrency: int = MAX_CONCURRENT_REQUESTS):
         self.timeout = timeout
         self.base_url = "https://{lang}.wikipedia.org/w/api.php"
-        self._lock = Lock()
+        self._session = create_session(max_concurrency)
+        self._slots = BoundedSemaphore(max_concurrency)
     
     def search(self, query: str, lang: str = "id") -> Dict:
         """
@@ -126,19 +175,44 @@ class WikipediaSearchClient:
             lang: Language code (id=Indonesian, en=English)
             
         Returns:
-            Dict with summary and URL or error
+            Dict with "ok" flag plus summary and URL, or error
+        """
+        return self._search_languages(query, lang)
+    
+    def search_book(self, title: str, author: str, lang: str = "id") -> Dict:
         """
-        # Try Indonesian first, then English as fallback
+        Find the best article for a book with a single query per language
+        
+        Title and author are OR-joined into one search, so a title miss no longer
+        costs a second round-trip for the author. An article whose title contains
+        the book title wins; otherwise the top hit (usually the author) is used.
+        
+        Args:
+            title: Book title
+            author: Book author
+            lang: Language code (id=Indonesian, en=English)
+            
+        Returns:
+            Dict with "ok" flag plus summary and URL, or error
+        """
+        terms = [f'"{term}"' for term in (title, author) if term]
+        if not terms:
+            return {"ok": False, "error": "No Wikipedia article found", "summary": "", "url": ""}
+        
+        return self._search_languages(" OR ".join(terms), lang, limit=2, prefer=title)
+    
+    def _search_languages(self, query: str, lang: str, limit: int = 1, prefer: Optional[str] = None) -> Dict:
+        """Try the requested language first, then English as fallback"""
         languages = [lang, "en"] if lang == "id" else ["en"]
         
         for current_lang in languages:
-            result = self._search_lang(query, current_lang)
-            if result and not result.get("error"):
+            result = self._search_lang(query, current_lang, limit, prefer)
+            if result and result["ok"]:
                 return result
         
-        return {"error": "No Wikipedia article found", "summary": "", "url": ""}
+        return {"ok": False, "error": "No Wikipedia article found", "summary": "", "url": ""}
     
-    def _search_lang(self, query: str, lang: str) -> Optional[Dict]:
+    def _search_lang(self, query: str, lang: str, limit: int = 1, prefer: Optional[str] = None) -> Optional[Dict]:
         """Search Wikipedia in specific language"""
         url = self.base_url.format(lang=lang)
         
@@ -148,12 +222,12 @@ class WikipediaSearchClient:
             "list": "search",
             "srsearch": query,
             "format": "json",
-            "srlimit": 1
+            "srlimit": limit
         }
         
         try:
-            with self._lock:
-                response = requests.get(url, params=search_params, timeout=self.timeout)
+            with self._slots:
+                response = self._session.get(url, params=search_params, timeout=self.timeout)
             
             if response.status_code != 200:
                 return None
@@ -164,8 +238,12 @@ class WikipediaSearchClient:
             if not search_results:
                 return None
             
-            # Get the page title
-            page_title = search_results[0].get("title")
+            # Get the page title, preferring a hit that names the book itself
+            best = search_results[0]
+            if prefer:
+                wanted = prefer.lower()
+                best = next((r for r in search_results if wanted in r.get("title", "").lower()), best)
+            page_title = best.get("title")
             
             # Get the extract (summary)
             extract_params = {
@@ -178,8 +256,8 @@ class WikipediaSearchClient:
                 "inprop": "url"
             }
             
-            with self._lock:
-                extract_response = requests.get(url, params=extract_params, timeout=self.timeout)
+            with self._slots:
+                extract_response = self._session.get(url, params=extract_params, timeout=self.timeout)
             
             if extract_response.status_code != 200:
                 return None
@@ -197,6 +275,7 @@ class WikipediaSearchClient:
             
             if summary:
                 return {
+                    "ok": True,
                     "summary": summary[:1000],  # Limit to 1000 chars
                     "url": page_url,
                     "title": page_title,
@@ -206,9 +285,9 @@ class WikipediaSearchClient:
             return None
             
         except requests.exceptions.Timeout:
-            return {"error": "Wikipedia timeout"}
+            return {"ok": False, "error": "Wikipedia timeout"}
         except Exception as e:
-            return {"error": f"Wikipedia search failed: {str(e)}"}
+            return {"ok": False, "error": f"Wikipedia search failed: {str(e)}"}
 
 
 class SearchAggregator:
@@ -255,15 +334,12 @@ class SearchAggregator:
         max_iterations = 2
         min_informative_needed = 3
         
-        # 1. Wikipedia Search (Single attempt)
+        # 1. Wikipedia Search (Single attempt, title and author in one query)
         if self.wiki_client:
-            wiki_result = self.wiki_client.search(title, lang="id")
+            wiki_result = self.wiki_client.search_book(title, author, lang="id")
             results["search_metadata"]["queries_used"] += 1
-            if "error" in wiki_result:
-                wiki_result = self.wiki_client.search(author, lang="id")
-                results["search_metadata"]["queries_used"] += 1
             
-            if "error" not in wiki_result and wiki_result.get("summary"):
+            if wiki_result["ok"] and wiki_result.get("summary"):
                 results["wikipedia_summary"] = wiki_result.get("summary", "")
                 results["wikipedia_url"] = wiki_result.get("url", "")
                 results["search_metadata"]["total_sources"] += 1
@@ -306,45 +382,32 @@ class SearchAggregator:
             
             # Perform Search
             if self.brave_client and self.brave_client.api_key:
-                brave_res = self.brave_client.search(brave_query, self.max_results)
                 results["search_metadata"]["queries_used"] += 1
+                new_results = []
                 
-                if "error" in brave_res:
-                    error_msg = f"Brave (Iter {current_iteration+1}): {brave_res['error']}"
+                try:
+                    for r in self.brave_client.iter_results(brave_query, self.max_results):
+                        if r['url'] in seen_urls:
+                            continue
+                        # Pre-filter by domain as well (manual check just in case API missed it)
+                        if any(domain in r['url'].lower() for domain in EXCLUDED_DOMAINS):
+                            continue
+                        seen_urls.add(r['url'])
+                        new_results.append(r)
+                    
+                    # One evaluator call per iteration: the body is already fully buffered
+                    if new_results:
+                        informative_results.extend(self._filter_informative(new_results, book_info, relevance_evaluator, results))
+                        
+                except BraveSearchError as e:
+                    error_msg = f"Brave (Iter {current_iteration+1}): {e}"
                     results["search_metadata"]["errors"].append(error_msg)
                     print(f"[SEARCH_ERROR] {error_msg}")
                     
                     # If rate limit or auth error, stop trying
-                    if "Rate limit" in brave_res['error'] or "Invalid" in brave_res['error']:
+                    if "Rate limit" in str(e) or "Invalid" in str(e):
                         print(f"[SEARCH_ERROR] Critical error, stopping search iterations")
                         break
-                else:
-                    new_results = []
-                    for r in brave_res.get("results", []):
-                        if r['url'] not in seen_urls:
-                            # Pre-filter by domain as well (manual check just in case API missed it)
-                            is_excluded = any(domain in r['url'].lower() for domain in EXCLUDED_DOMAINS)
-                            if not is_excluded:
-                                new_results.append(r)
-                                seen_urls.add(r['url'])
-                    
-                    if new_results:
-                        if relevance_evaluator:
-                            # Evaluate relevance using AI callback
-                            try:
-                                # relevance_evaluator returns a list of labels ("scholarly", "general", "shallow")
-                                relevance_labels = relevance_evaluator(new_results, book_info)
-                                for idx, label in enumerate(relevance_labels):
-                                    if label in ["scholarly", "general"]:
-                                        res_to_add = new_results[idx]
-                                        res_to_add['quality_label'] = label
-                                        informative_results.append(res_to_add)
-                            except Exception as e:
-                                results["search_metadata"]["errors"].append(f"AI Eval failed: {e}")
-                                # Fallback: take all non-excluded results if AI fails
-                                informative_results.extend(new_results)
-                        else:
-                            informative_results.extend(new_results)
             
             current_iteration += 1
             if len(informative_results) >= min_informative_needed:
@@ -359,6 +422,66 @@ class SearchAggregator:
         
         return results
     
+    def search_many(self, books: List[Dict], relevance_evaluator: Optional[callable] = None,
+                    concurrency: int = MAX_CONCURRENT_REQUESTS) -> List[Dict]:
+        """
+        Run search() for several books concurrently
+        
+        All books share this aggregator's clients, so their requests reuse the same
+        keep-alive connection pools and stay within each client's concurrency cap:
+        Wikipedia lookups overlap, while Brave calls still go out one at a time.
+        
+        Args:
+            books: List of dicts with "title", "author" and optional "genre"
+            relevance_evaluator: Callback passed through to search()
+            concurrency: Maximum number of books searched at once
+            
+        Returns:
+            One result dict per book, in input order. A book whose search raised
+            gets {"error": ...} instead of aggregated results.
+        """
+        if not books:
+            return []
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(books)))) as executor:
+            futures = [
+                executor.submit(self.search, b.get("title", ""), b.get("author", ""), b.get("genre", ""), relevance_evaluator)
+                for b in books
+            ]
+            
+            batch_results = []
+            for book, future in zip(books, futures):
+                try:
+                    batch_results.append(future.result())
+                except Exception as e:
+                    print(f"[SEARCH_ERROR] Batch search failed for '{book.get('title', '')}': {e}")
+                    batch_results.append({"error": f"Search failed: {str(e)}"})
+        
+        return batch_results
+    
+    def _filter_informative(self, candidates: List[Dict], book_info: Dict,
+                            relevance_evaluator: Optional[callable], results: Dict) -> List[Dict]:
+        """Keep the candidates the relevance evaluator labels as informative"""
+        if not relevance_evaluator:
+            return candidates
+        
+        informative = []
+        # Evaluate relevance using AI callback
+        try:
+            # relevance_evaluator returns a list of labels ("scholarly", "general", "shallow")
+            relevance_labels = relevance_evaluator(candidates, book_info)
+            for idx, label in enumerate(relevance_labels):
+                if label in ["scholarly", "general"]:
+                    res_to_add = candidates[idx]
+                    res_to_add['quality_label'] = label
+                    informative.append(res_to_add)
+        except Exception as e:
+            results["search_metadata"]["errors"].append(f"AI Eval failed: {e}")
+            # Fallback: take all non-excluded results if AI fails
+            return candidates
+        
+        return informative
+    
     def format_for_prompt(self, search_results: Dict) -> str:
         """
         Format search results for inclusion in AI prompt
@@ -386,7 +509,7 @@ Reference: Wikipedia [High Weight]
             web_sources = []
             for idx, result in enumerate(search_results["brave_results"][:5], 1):
                 # Extract domain name for cleaner reference
-                match = re.search(r'https?://(?:www\.)?([^/]+)', result['url'])
+                match = _DOMAIN_RE.search(result['url'])
                 domain = match.group(1) if match else result['url']
                 
                 label = result.get('quality_label', 'general').upper()
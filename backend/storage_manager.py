@@ -1,33 +1,78 @@
-import json
+import hashlib
+import mmap
 import os
+import tempfile
+import threading
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
-import requests
-import shutil
+import orjson
 from pathlib import Path
 
+from http_utils import create_session
+
 DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'saved_summaries.json')
+LOG_FILE = os.path.join(os.path.dirname(__file__), 'data', 'changes.log')
 COVERS_DIR = os.path.join(os.path.dirname(__file__), 'covers')
 
+# The change log is folded back into the snapshot once it outgrows it by this
+# factor, but never below COMPACTION_MIN_BYTES so small libraries don't compact
+# on nearly every write.
+COMPACTION_RATIO = 4
+COMPACTION_MIN_BYTES = 256 * 1024
+
+# Parallel cover downloads when saving many summaries at once
+COVER_DOWNLOAD_WORKERS = 8
+# Covers are copied in large chunks and refused past MAX_COVER_BYTES
+COVER_CHUNK_SIZE = 256 * 1024
+MAX_COVER_BYTES = 10 * 1024 * 1024
+# File extension by response Content-Type; anything else is stored as .jpg
+COVER_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/gif': 'gif'
+}
+
+# Writes landing within this window (seconds) share a single fsync of the change log
+FLUSH_DELAY = 0.05
+
 class StorageManager:
     def __init__(self):
         self._ensure_data_dir()
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._cover_pool = ThreadPoolExecutor(max_workers=COVER_DOWNLOAD_WORKERS)
+        self._http = create_session(COVER_DOWNLOAD_WORKERS, retries=2)
+        # book_id -> book, most recently updated first
+        self._books: OrderedDict[str, Dict] = OrderedDict((book['id'], book) for book in self._load_data())
+        self._book_by_isbn: Dict[str, Dict] = {}
+        self._book_by_title_author: Dict[Tuple[str, str], Dict] = {}
+        self._variant_by_id: Dict[str, Tuple[Dict, Dict]] = {}
+        self._note_by_id: Dict[Tuple[str, str], Dict] = {}
+        self._rebuild_index()
+        self._replay_log()
+        self._log_fd = open(LOG_FILE, 'ab', buffering=0)
 
     def _ensure_data_dir(self):
         os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
         os.makedirs(COVERS_DIR, exist_ok=True)
         if not os.path.exists(DATA_FILE):
-            with open(DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump([], f)
+            Path(DATA_FILE).write_bytes(orjson.dumps([]))
 
     def _load_data(self) -> List[Dict]:
         try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return self._migrate_if_needed(data)
-        except (json.JSONDecodeError, FileNotFoundError):
+            with open(DATA_FILE, 'rb') as f:
+                # Parse straight from the page cache instead of copying the file into a bytes object
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    data = orjson.loads(view)
+            return self._migrate_if_needed(data)
+        except (orjson.JSONDecodeError, FileNotFoundError, ValueError):
+            # ValueError: mmap refuses empty files
             return []
 
     def _migrate_if_needed(self, data: List[Dict]) -> List[Dict]:
@@ -91,28 +136,304 @@ class StorageManager:
         return new_data
 
     def _save_data(self, data: List[Dict]):
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Writes a full snapshot via temp file + rename so a crash never leaves it truncated."""
+        tmp_file = DATA_FILE + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, DATA_FILE)
+
+    def _rebuild_index(self):
+        self._book_by_isbn = {}
+        self._book_by_title_author = {}
+        # Oldest first so the most recently updated book owns a shared key, as the old scan did
+        for book in reversed(self._books.values()):
+            self._index_book_keys(book)
+            for variant in book['summaries']:
+                self._share_metadata(book, variant)
+        self._variant_by_id = {
+            variant['id']: (book, variant)
+            for book in self._books.values()
+            for variant in book['summaries']
+        }
+        # Notes are keyed by (summary_id, note_id) since note ids may come from the client
+        self._note_by_id = {
+            (variant['id'], note['id']): note
+            for book in self._books.values()
+            for variant in book['summaries']
+            for note in variant.get('notes', [])
+            if 'id' in note
+        }
+
+    def _replay_log(self):
+        """
+        Re-applies the change log on top of the loaded snapshot.
+        A torn trailing line (crash mid-append) is cut off so new events
+        don't get glued onto it.
+        """
+        if not os.path.exists(LOG_FILE):
+            return
+
+        complete_bytes = 0
+        with open(LOG_FILE, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    print("[STORAGE] Dropping torn change log tail")
+                    break
+                complete_bytes += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    event = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    print("[STORAGE] Skipping corrupt change log entry")
+                    continue
+                try:
+                    self._apply(event)
+                except (KeyError, TypeError) as e:
+                    print(f"[STORAGE] Failed to replay '{event.get('op')}' event: {e}")
+
+        if complete_bytes < os.path.getsize(LOG_FILE):
+            os.truncate(LOG_FILE, complete_bytes)
+
+    def _commit(self, event: Dict):
+        """
+        Appends an event to the change log, then applies it in memory.
+        Must be called with self._lock held.
+        """
+        # Events go straight to the unbuffered fd: once write() returns, a process
+        # crash can no longer lose them (only power loss before the coalesced fsync)
+        self._log_fd.write(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE))
+        self._schedule_flush()
+        self._apply(event)
+        self._maybe_compact()
+
+    def _schedule_flush(self):
+        # The unbuffered write already reached the OS, so only a power loss inside
+        # FLUSH_DELAY can drop it; a burst of edits costs one fsync instead of many.
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Forces pending change log writes to disk."""
+        with self._lock:
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        os.fsync(self._log_fd.fileno())
+
+    def _apply(self, event: Dict):
+        """
+        Applies a single change event to the in-memory library.
+
+        Events are idempotent, so replaying a log that was already folded into
+        the snapshot (crash between snapshot rename and log truncation) is safe.
+        """
+        op = event['op']
+
+        if op == 'add_summary':
+            fields = event['book']
+            book = self._books.get(fields['id'])
+            if book is None:
+                book = {**fields, "summaries": []}
+                self._books[book['id']] = book
+            else:
+                self._unindex_book_keys(book)
+                book.update(fields)
+            self._index_book_keys(book)
+            variant = event['variant']
+            if variant['id'] not in self._variant_by_id:
+                self._share_metadata(book, variant)
+                book['summaries'].insert(0, variant)
+                self._variant_by_id[variant['id']] = (book, variant)
+            self._move_to_front(book)
+
+        elif op == 'update_book':
+            book = self._books.get(event['book_id'])
+            if book:
+                self._unindex_book_keys(book)
+                book.update(event['fields'])
+                self._index_book_keys(book)
+                self._move_to_front(book)
+
+        elif op == 'update_summary':
+            entry = self._variant_by_id.get(event['summary_id'])
+            if entry:
+                book, variant = entry
+                variant.update(event['fields'])
+                book['last_updated'] = event['last_updated']
+                self._move_to_front(book)
+
+        elif op == 'delete_summary':
+            entry = self._variant_by_id.pop(event['summary_id'], None)
+            if entry:
+                book, variant = entry
+                self._drop_notes(variant)
+                book['summaries'] = [s for s in book['summaries'] if s is not variant]
+                if not book['summaries']:
+                    self._remove_book(book['id'])
+
+        elif op == 'delete_book':
+            self._remove_book(event['book_id'])
+
+        elif op == 'add_note':
+            entry = self._variant_by_id.get(event['summary_id'])
+            if entry:
+                book, variant = entry
+                note = event['note']
+                key = (variant['id'], note['id'])
+                if key not in self._note_by_id:
+                    variant.setdefault('notes', []).append(note)
+                    self._note_by_id[key] = note
+                book['last_updated'] = event['last_updated']
+                self._move_to_front(book)
+
+        elif op == 'update_note':
+            entry = self._variant_by_id.get(event['summary_id'])
+            note = self._note_by_id.get((event['summary_id'], event['note_id']))
+            if entry and note:
+                book, _ = entry
+                note.update(event['fields'])
+                book['last_updated'] = event['last_updated']
+                self._move_to_front(book)
 
-    def _download_cover(self, url: str, book_id: str) -> str:
+        elif op == 'delete_note':
+            entry = self._variant_by_id.get(event['summary_id'])
+            note = self._note_by_id.pop((event['summary_id'], event['note_id']), None)
+            if entry and note:
+                book, variant = entry
+                variant['notes'] = [n for n in variant['notes'] if n is not note]
+                book['last_updated'] = event['last_updated']
+                self._move_to_front(book)
+
+        else:
+            print(f"[STORAGE] Unknown change log op: {op}")
+
+    def _remove_book(self, book_id: str):
+        book = self._books.pop(book_id, None)
+        if book is None:
+            return
+        self._unindex_book_keys(book)
+        for variant in book['summaries']:
+            self._variant_by_id.pop(variant['id'], None)
+            self._drop_notes(variant)
+
+    def _index_book_keys(self, book: Dict):
+        if book.get('isbn'):
+            self._book_by_isbn[book['isbn']] = book
+        self._book_by_title_author[(book['title'].lower(), book['author'].lower())] = book
+
+    def _unindex_book_keys(self, book: Dict):
+        if self._book_by_isbn.get(book.get('isbn')) is book:
+            del self._book_by_isbn[book['isbn']]
+        key = (book['title'].lower(), book['author'].lower())
+        if self._book_by_title_author.get(key) is book:
+            del self._book_by_title_author[key]
+
+    def _share_metadata(self, book: Dict, variant: Dict):
+        # Variants generated from the same source usually carry identical metadata
+        # (sources, cover, identifiers); keep one dict per book instead of N copies.
+        # Metadata is never mutated after save, so sharing the object is safe.
+        metadata = variant.get('metadata')
+        if not metadata:
+            return
+        for other in book['summaries']:
+            if other is not variant and other.get('metadata') == metadata:
+                variant['metadata'] = other['metadata']
+                return
+
+    def _drop_notes(self, variant: Dict):
+        for note in variant.get('notes', []):
+            self._note_by_id.pop((variant['id'], note.get('id')), None)
+
+    def _move_to_front(self, book: Dict):
+        # Every mutation stamps last_updated with "now", so moving the touched
+        # book to the front keeps the library ordered by recency without a re-sort
+        self._books.move_to_end(book['id'], last=False)
+
+    def _maybe_compact(self):
+        """Starts a background compaction once the log outgrows the snapshot."""
+        if self._compacting:
+            return
+
+        log_size = os.fstat(self._log_fd.fileno()).st_size
+        try:
+            snapshot_size = os.path.getsize(DATA_FILE)
+        except OSError:
+            snapshot_size = 0
+
+        if log_size > max(COMPACTION_RATIO * snapshot_size, COMPACTION_MIN_BYTES):
+            self._compacting = True
+            threading.Thread(target=self._compact, daemon=True).start()
+
+    def _compact(self):
+        """Writes a fresh snapshot of the in-memory library and truncates the change log."""
+        try:
+            with self._lock:
+                self._save_data(list(self._books.values()))
+                self._log_fd.truncate(0)
+                os.fsync(self._log_fd.fileno())
+        except OSError as e:
+            print(f"[STORAGE] Compaction failed: {e}")
+        finally:
+            self._compacting = False
+
+    def _find_book(self, isbn: str, title: str, author: str) -> Optional[Dict]:
+        # Check ISBN match if valid
+        if isbn:
+            return self._book_by_isbn.get(isbn)
+        # Check Title + Author match (case-insensitive for better UX)
+        return self._book_by_title_author.get((title.lower(), author.lower()))
+
+    def _download_cover(self, url: str) -> str:
         """
-        Downloads cover from URL and saves to covers/book_id.jpg.
-        Returns the relative path 'covers/book_id.jpg' or original URL if failed.
+        Downloads cover from URL and saves to covers/<url hash>.<ext>.
+        The same URL always maps to the same file, so repeated imports reuse it.
+        Returns the relative path 'covers/<file>' or original URL if failed.
         """
         if not url or not url.startswith('http'):
             return url
 
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+        for ext in COVER_EXTENSIONS.values():
+            if os.path.exists(os.path.join(COVERS_DIR, f"{digest}.{ext}")):
+                return f"covers/{digest}.{ext}"
+
         try:
-            response = requests.get(url, stream=True, timeout=10)
+            response = self._http.get(url, stream=True, timeout=10)
             if response.status_code == 200:
-                # Create a safe filename usually based on book ID
-                filename = f"{book_id}.jpg"
+                if int(response.headers.get('Content-Length') or 0) > MAX_COVER_BYTES:
+                    print(f"Cover at {url} exceeds {MAX_COVER_BYTES} bytes, skipping download")
+                    response.close()
+                    return url
+
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                filename = f"{digest}.{COVER_EXTENSIONS.get(content_type, 'jpg')}"
                 file_path = os.path.join(COVERS_DIR, filename)
                 
-                with open(file_path, 'wb') as f:
+                written = 0
+                # Write to a private temp file so concurrent downloads of the same URL can't interleave
+                with tempfile.NamedTemporaryFile('wb', dir=COVERS_DIR, suffix='.part', delete=False) as f:
+                    tmp_path = f.name
                     response.raw.decode_content = True
-                    shutil.copyfileobj(response.raw, f)
-                
+                    # Content-Length can be absent or wrong, so enforce the cap while copying
+                    while written <= MAX_COVER_BYTES:
+                        chunk = response.raw.read(COVER_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        written += len(chunk)
+                response.close()
+
+                if written > MAX_COVER_BYTES:
+                    os.remove(tmp_path)
+                    print(f"Cover at {url} exceeds {MAX_COVER_BYTES} bytes, skipping download")
+                    return url
+
+                os.replace(tmp_path, file_path)
                 return f"covers/{filename}"
         except Exception as e:
             print(f"Failed to download cover from {url}: {e}")
@@ -124,34 +445,25 @@ class StorageManager:
         Saves a summary. Groups by ISBN or Title+Author.
         Returns the summary variant object (with its ID).
         """
-        data = self._load_data()
-        
         isbn = summary_data.get('metadata', {}).get('isbn', '')
         title = summary_data['title'].strip()
         author = summary_data['author'].strip()
         genre = summary_data.get('metadata', {}).get('genre', '')
         published_date = summary_data.get('metadata', {}).get('publishedDate', '')
-        
-        target_book = None
-        
+        raw_url = summary_data.get('metadata', {}).get('image_url', '')
+
         # 1. Try to find existing book
-        for book in data:
-            # Check ISBN match if valid
-            if isbn and book.get('isbn') == isbn:
-                target_book = book
-                break
-            # Check Title + Author match (case-insensitive for better UX)
-            if (not isbn and 
-                book['title'].lower() == title.lower() and 
-                book['author'].lower() == author.lower()):
-                target_book = book
-                break
-        
+        with self._lock:
+            target_book = self._find_book(isbn, title, author)
+            book_id = target_book['id'] if target_book else str(uuid.uuid4())
+            needs_cover = not target_book or not target_book.get('image_url')
+
+        # Download the cover outside the lock so other writers aren't blocked on the network
+        image_url = self._download_cover(raw_url) if needs_cover else None
+
         timestamp = datetime.now().isoformat()
-        variant_id = str(uuid.uuid4())
-        
         new_variant = {
-            "id": variant_id,
+            "id": str(uuid.uuid4()),
             "summary_content": summary_data['summary_content'],
             "notes": [], # Initialize empty notes
             "usage_stats": summary_data.get('usage_stats', {}),
@@ -161,217 +473,206 @@ class StorageManager:
             "model": summary_data.get('usage_stats', {}).get('model', 'Unknown')
         }
 
-        if target_book:
-            # Append to existing
-            target_book['summaries'].insert(0, new_variant)
-            target_book['last_updated'] = timestamp
-            # Update metadata if missing
-            if not target_book.get('isbn') and isbn:
-                target_book['isbn'] = isbn
-            if not target_book.get('genre') and genre:
-                target_book['genre'] = genre
-            if not target_book.get('publishedDate') and published_date:
-                target_book['publishedDate'] = published_date
-            # Update cover if missing
-            if not target_book.get('image_url'):
-                 raw_url = summary_data.get('metadata', {}).get('image_url', '')
-                 target_book['image_url'] = self._download_cover(raw_url, target_book['id'])
-        else:
-            # Create new book
-            book_id = str(uuid.uuid4())
-            raw_url = summary_data.get('metadata', {}).get('image_url', '')
-            local_image_path = self._download_cover(raw_url, book_id)
-            
-            target_book = {
-                "id": book_id,
-                "title": title,
-                "author": author,
-                "genre": genre,
-                "publishedDate": published_date,
-                "isbn": isbn,
-                "image_url": local_image_path,
-                "created_at": timestamp,
-                "last_updated": timestamp,
-                "summaries": [new_variant]
-            }
-            data.insert(0, target_book)
+        with self._lock:
+            # Re-resolve: the book may have been created or deleted during the download
+            target_book = self._find_book(isbn, title, author)
+            if target_book:
+                # Append to existing
+                book_fields = {k: v for k, v in target_book.items() if k != 'summaries'}
+                book_fields['last_updated'] = timestamp
+                # Update metadata if missing
+                if not book_fields.get('isbn') and isbn:
+                    book_fields['isbn'] = isbn
+                if not book_fields.get('genre') and genre:
+                    book_fields['genre'] = genre
+                if not book_fields.get('publishedDate') and published_date:
+                    book_fields['publishedDate'] = published_date
+                # Update cover if missing
+                if not book_fields.get('image_url') and image_url is not None:
+                    book_fields['image_url'] = image_url
+            else:
+                # Create new book
+                book_fields = {
+                    "id": book_id,
+                    "title": title,
+                    "author": author,
+                    "genre": genre,
+                    "publishedDate": published_date,
+                    "isbn": isbn,
+                    "image_url": image_url if image_url is not None else raw_url,
+                    "created_at": timestamp,
+                    "last_updated": timestamp
+                }
 
-        # Sort books by recency
-        data.sort(key=lambda x: x['last_updated'], reverse=True)
-        self._save_data(data)
-        
-        return new_variant
+            self._commit({"op": "add_summary", "book": book_fields, "variant": new_variant})
+            return self._copy_variant(new_variant)
+
+    def save_summaries(self, summaries: List[Dict]) -> List[Dict]:
+        """
+        Saves several summaries, downloading their covers concurrently.
+        Returns the summary variants in input order.
+        """
+        # save_summary downloads outside the lock and re-resolves the target book
+        # before committing, so concurrent saves of the same new book still group.
+        futures = [self._cover_pool.submit(self.save_summary, data) for data in summaries]
+        return [future.result() for future in futures]
 
     def get_all_summaries(self) -> List[Dict]:
-        """Returns list of Books, each containing list of summaries."""
-        return self._load_data()
+        """
+        Returns list of Books, each containing list of summaries.
+
+        Books, variants and notes are copied under the lock, since callers
+        serialize the result after it is released while writers keep updating
+        the live dicts in place. Variant metadata is shared; it is never mutated.
+        """
+        with self._lock:
+            return [self._copy_book(book) for book in self._books.values()]
+
+    @classmethod
+    def _copy_book(cls, book: Dict) -> Dict:
+        # Snapshot for callers that read the result after the lock is released
+        return {**book, "summaries": [cls._copy_variant(v) for v in book['summaries']]}
+
+    @staticmethod
+    def _copy_variant(variant: Dict) -> Dict:
+        copy = dict(variant)
+        if 'notes' in copy:
+            copy['notes'] = [dict(note) for note in copy['notes']]
+        return copy
 
     def update_book_cover(self, book_id: str, new_url: str) -> Optional[str]:
         """
         Updates the cover for a specific book. Downloads the new image.
         Returns the new local path.
         """
-        data = self._load_data()
-        for book in data:
-            if book['id'] == book_id:
-                # Download new cover
-                local_path = self._download_cover(new_url, book_id)
-                book['image_url'] = local_path
-                book['last_updated'] = datetime.now().isoformat()
-                self._save_data(data)
-                return local_path
-        return None
+        with self._lock:
+            if book_id not in self._books:
+                return None
+
+        # Download new cover
+        local_path = self._download_cover(new_url)
+
+        with self._lock:
+            if book_id not in self._books:
+                return None
+            self._commit({
+                "op": "update_book",
+                "book_id": book_id,
+                "fields": {"image_url": local_path, "last_updated": datetime.now().isoformat()}
+            })
+        return local_path
 
     def update_book_metadata(self, book_id: str, title: str, author: str, isbn: str, genre: str = None, publishedDate: str = None) -> Optional[Dict]:
         """Updates basic metadata for a book."""
-        data = self._load_data()
-        book = next((b for b in data if b['id'] == book_id), None)
-        
-        if not book:
-            return None
-            
-        book['title'] = title
-        book['author'] = author
-        book['isbn'] = isbn
+        fields = {"title": title, "author": author, "isbn": isbn}
         if genre is not None:
-            book['genre'] = genre
+            fields['genre'] = genre
         if publishedDate is not None:
-            book['publishedDate'] = publishedDate
-        book['last_updated'] = datetime.now().isoformat()
-        
-        self._save_data(data)
-        return book
+            fields['publishedDate'] = publishedDate
+        fields['last_updated'] = datetime.now().isoformat()
+
+        with self._lock:
+            if book_id not in self._books:
+                return None
+            self._commit({"op": "update_book", "book_id": book_id, "fields": fields})
+            return self._copy_book(self._books[book_id])
 
     def delete_summary(self, summary_id: str) -> bool:
         """
         Deletes a specific summary variant.
         If a book has no summaries left, deletes the book too.
         """
-        data = self._load_data()
-        found = False
-        
-        for book in data:
-            original_count = len(book['summaries'])
-            book['summaries'] = [s for s in book['summaries'] if s['id'] != summary_id]
-            
-            if len(book['summaries']) < original_count:
-                found = True
-                # Update last_updated if needed, or leave it
-                break
-        
-        if found:
-            # Remove empty books
-            data = [b for b in data if len(b['summaries']) > 0]
-            self._save_data(data)
+        with self._lock:
+            if summary_id not in self._variant_by_id:
+                return False
+            self._commit({"op": "delete_summary", "summary_id": summary_id})
             return True
-            
-        return False
 
     def delete_book(self, book_id: str) -> bool:
         """Deletes an entire book and all its summaries."""
-        data = self._load_data()
-        initial_len = len(data)
-        data = [b for b in data if b['id'] != book_id]
-        
-        if len(data) < initial_len:
-            self._save_data(data)
+        with self._lock:
+            if book_id not in self._books:
+                return False
+            self._commit({"op": "delete_book", "book_id": book_id})
             return True
-        return False
     def update_summary_content(self, summary_id: str, new_content: str) -> bool:
         """Updates the content of a specific summary variant."""
-        data = self._load_data()
-        found = False
-        
-        for book in data:
-            for variant in book['summaries']:
-                if variant['id'] == summary_id:
-                    variant['summary_content'] = new_content
-                    variant['timestamp'] = datetime.now().isoformat() # Update variant timestamp
-                    book['last_updated'] = datetime.now().isoformat() # Update book timestamp
-                    found = True
-                    break
-            if found:
-                break
-        
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            if summary_id not in self._variant_by_id:
+                return False
+            self._commit({
+                "op": "update_summary",
+                "summary_id": summary_id,
+                "fields": {"summary_content": new_content, "timestamp": timestamp}, # Update variant timestamp
+                "last_updated": timestamp # Update book timestamp
+            })
+            return True
+
     def add_note_to_summary(self, summary_id: str, note_data: Dict) -> Optional[Dict]:
         """Appends a note to a specific summary variant."""
-        data = self._load_data()
-        found_variant = None
-        
-        for book in data:
-            for variant in book['summaries']:
-                if variant['id'] == summary_id:
-                    if 'notes' not in variant:
-                        variant['notes'] = []
-                    
-                    # Ensure note has an ID and timestamp
-                    if 'id' not in note_data:
-                        note_data['id'] = str(uuid.uuid4())
-                    if 'timestamp' not in note_data:
-                        note_data['timestamp'] = datetime.now().isoformat()
-                        
-                    variant['notes'].append(note_data)
-                    book['last_updated'] = datetime.now().isoformat()
-                    found_variant = variant
-                    break
-            if found_variant:
-                break
-        
-        if found_variant:
-            data.sort(key=lambda x: x['last_updated'], reverse=True)
-            self._save_data(data)
-            return note_data
-            
-        return None
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            if summary_id not in self._variant_by_id:
+                return None
+
+            # Ensure note has an ID and timestamp
+            if 'id' not in note_data:
+                note_data['id'] = str(uuid.uuid4())
+            if 'timestamp' not in note_data:
+                note_data['timestamp'] = timestamp
+
+            self._commit({
+                "op": "add_note",
+                "summary_id": summary_id,
+                "note": note_data,
+                "last_updated": timestamp
+            })
+            return dict(note_data)
+
     def update_note_in_summary(self, summary_id: str, note_id: str, note_data: Dict) -> Optional[Dict]:
         """Updates an existing note in a specific summary variant."""
-        data = self._load_data()
-        found_note = None
-        
-        for book in data:
-            for variant in book['summaries']:
-                if variant['id'] == summary_id:
-                    if 'notes' in variant:
-                        for i, note in enumerate(variant['notes']):
-                            if note.get('id') == note_id:
-                                # Update fields
-                                for key, value in note_data.items():
-                                    note[key] = value
-                                note['timestamp'] = datetime.now().isoformat()
-                                found_note = note
-                                break
-                    if found_note:
-                        book['last_updated'] = datetime.now().isoformat()
-                        break
-            if found_note:
-                break
-        
-        if found_note:
-            data.sort(key=lambda x: x['last_updated'], reverse=True)
-            self._save_data(data)
-            return found_note
-            
-        return None
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            found_note = self._note_by_id.get((summary_id, note_id))
+            if not found_note:
+                return None
+
+            self._commit({
+                "op": "update_note",
+                "summary_id": summary_id,
+                "note_id": note_id,
+                "fields": {**note_data, "timestamp": timestamp},
+                "last_updated": timestamp
+            })
+            return dict(found_note)
     def delete_note_from_summary(self, summary_id: str, note_id: str) -> bool:
         """Removes a specific note from a summary variant."""
-        data = self._load_data()
-        found = False
-        
-        for book in data:
-            for variant in book['summaries']:
-                if variant['id'] == summary_id:
-                    if 'notes' in variant:
-                        original_count = len(variant['notes'])
-                        variant['notes'] = [n for n in variant['notes'] if n.get('id') != note_id]
-                        if len(variant['notes']) < original_count:
-                            found = True
-                            book['last_updated'] = datetime.now().isoformat()
-                            break
-            if found:
-                break
-        
-        if found:
-            self._save_data(data)
+        timestamp = datetime.now().isoformat()
+        with self._lock:
+            if (summary_id, note_id) not in self._note_by_id:
+                return False
+
+            self._commit({
+                "op": "delete_note",
+                "summary_id": summary_id,
+                "note_id": note_id,
+                "last_updated": timestamp
+            })
             return True
-            
-        return False
+
+
+_shared_manager: Optional[StorageManager] = None
+_shared_manager_lock = threading.Lock()
+
+def get_storage_manager() -> StorageManager:
+    """
+    Returns the process-wide StorageManager.
+    The in-memory library and change log must have a single owner; a second
+    instance would replay the whole log and could append conflicting events.
+    """
+    global _shared_manager
+    with _shared_manager_lock:
+        if _shared_manager is None:
+            _shared_manager = StorageManager()
+        return _shared_manager
@@ -1,19 +1,169 @@
+import asyncio
 import concurrent.futures
+import functools
 import json
-import re
+import os
 import time
-from difflib import SequenceMatcher
-from threading import Lock
-from typing import Dict, Generator, AsyncGenerator, List, Optional
+from threading import Lock, Thread
+from typing import Awaitable, Callable, Dict, Generator, AsyncGenerator, List, Optional, Set, Tuple
 
 import requests
 import anyio
-from openai import OpenAI
-
-from currency_manager import CurrencyManager
+import httpx
+import orjson
+from openai import AsyncOpenAI, OpenAI
+
+from currency_manager import get_currency_manager
+from http_utils import create_session
+from response_cache import ResponseCache, get_response_cache
+from search_service import create_search_aggregator
 import prompt_templates
 import summarizer_utils
 
+try:
+    import h2  # Optional: lets httpx multiplex concurrent drafts over one HTTP/2 connection
+except ImportError:
+    h2 = None
+
+
+# Shared keep-alive pool for OpenRouter metadata and Ollama calls
+_HTTP = create_session(16, retries=2)
+
+# Shared keep-alive pool for the OpenAI SDK (OpenRouter/Groq). A summarizer is built
+# per request, so giving each its own client would pay a fresh TCP/TLS handshake every call.
+_HTTPX_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0)
+_HTTPX_CLIENT = httpx.Client(
+    limits=_HTTPX_LIMITS,
+    timeout=httpx.Timeout(60.0, connect=10.0),
+    http2=h2 is not None
+)
+
+# Async pool for streaming responses (Ollama NDJSON and the AsyncOpenAI SDK), read on
+# the event loop instead of hopping to a worker thread for every line or token
+_ASYNC_HTTPX_CLIENT = httpx.AsyncClient(
+    limits=_HTTPX_LIMITS,
+    timeout=httpx.Timeout(60.0, connect=10.0),
+    http2=h2 is not None
+)
+
+
+# Resolves exchange rate / model pricing while the LLM is still generating
+_COST_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+COST_PREFETCH_WAIT = 2.0
+
+# Shared by every summarize_tournament call instead of a pool per request; threads are
+# only spawned as drafts need them and are reused across tournaments
+_DRAFT_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=16, thread_name_prefix="draft")
+
+# Ollama NDJSON lines above this size (the closing line carries the whole token `context`
+# array) are parsed in a worker thread; per-token lines are tiny and parse faster inline
+OLLAMA_INLINE_PARSE_LIMIT = 16 * 1024
+
+# Tournament straggler cutoff: once all but one draft are in, the last one gets this fraction
+# of the time drafting has taken so far (but at least STRAGGLER_MIN_WAIT seconds) before
+# judging starts without it
+STRAGGLER_GRACE_RATIO = 0.5
+STRAGGLER_MIN_WAIT = 5.0
+# Seconds between "still drafting" status frames while no draft has finished
+DRAFT_HEARTBEAT_INTERVAL = 2.0
+# Streamed section-synthesis deltas per token-count progress report
+SECTION_PROGRESS_EVERY = 32
+
+
+@functools.lru_cache(maxsize=256)
+def _norm_section(name: str) -> str:
+    """normalize_section_name against the fixed NAME_MAPPINGS, memoized: synthesis
+    re-normalizes the same handful of headers many times over."""
+    return summarizer_utils.normalize_section_name(name, prompt_templates.NAME_MAPPINGS)
+
+
+async def _aiter_ndjson(response: httpx.Response) -> AsyncGenerator[Dict, None]:
+    """
+    Yields the objects of a streamed NDJSON response. Lines are split from the raw
+    bytes and handed to orjson as-is, skipping the str decode aiter_lines() does per line.
+
+    Args:
+        response: Open httpx streaming response
+
+    Yields:
+        One parsed dict per non-empty line
+    """
+    buf = bytearray()
+    async for chunk in response.aiter_bytes():
+        buf += chunk
+        pos = 0
+        while (nl := buf.find(b"\n", pos)) != -1:
+            line = buf[pos:nl]
+            pos = nl + 1
+            if len(line) > OLLAMA_INLINE_PARSE_LIMIT:
+                yield await anyio.to_thread.run_sync(orjson.loads, line)
+            elif line.strip():
+                yield orjson.loads(line)
+        del buf[:pos]
+    if buf.strip():
+        yield orjson.loads(buf)
+
+
+# (provider base URL, async pool?) -> when that connection was last prewarmed. Summarizers
+# are built per request, so only the first one in each keep-alive window pays for a HEAD.
+_PREWARMED_AT: Dict[Tuple[str, bool], float] = {}
+_PREWARM_LOCK = Lock()
+# Pending async prewarms, referenced so the event loop doesn't drop them mid-request
+_PREWARM_TASKS: Set[asyncio.Task] = set()
+
+
+def _prewarm_connection(base_url: str):
+    """
+    Opens a keep-alive connection to the provider in the background, so the first
+    completion request reuses it instead of paying the TCP/TLS handshake.
+
+    A summarizer built on the event loop (the async endpoints) streams through
+    AsyncOpenAI, so the async pool is warmed by a task on that loop; one built in a
+    worker thread calls the sync client, so the sync pool is warmed from a thread.
+
+    Args:
+        base_url: Provider API root (e.g. https://openrouter.ai/api/v1)
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    now = time.monotonic()
+    key = (base_url, loop is not None)
+    with _PREWARM_LOCK:
+        if now - _PREWARMED_AT.get(key, float("-inf")) < _HTTPX_LIMITS.keepalive_expiry:
+            return
+        _PREWARMED_AT[key] = now
+
+    if loop is not None:
+        task = loop.create_task(_prewarm_async(base_url))
+        _PREWARM_TASKS.add(task)
+        task.add_done_callback(_PREWARM_TASKS.discard)
+        return
+
+    def head():
+        try:
+            _HTTPX_CLIENT.head(f"{base_url}/models", timeout=5.0)
+        except httpx.HTTPError:
+            pass  # Best effort: the real request simply opens its own connection
+
+    Thread(target=head, daemon=True).start()
+
+
+async def _prewarm_async(base_url: str):
+    try:
+        await _ASYNC_HTTPX_CLIENT.head(f"{base_url}/models", timeout=5.0)
+    except httpx.HTTPError:
+        pass  # Best effort, as in the sync prewarm
+
+
+async def shutdown_http():
+    """Close the shared HTTP pools. Call once on application shutdown."""
+    _HTTPX_CLIENT.close()
+    _HTTP.close()
+    await _ASYNC_HTTPX_CLIENT.aclose()
+
 
 class BookSummarizerError(Exception):
     """Base exception for BookSummarizer errors"""
@@ -21,11 +171,26 @@ class BookSummarizerError(Exception):
 
 
 class BookSummarizer:
+    # One instance is built per request; slots drop the per-instance __dict__
+    __slots__ = (
+        "api_key", "init_error", "model_name", "provider", "base_url", "timeout", "max_retries",
+        "currency_manager", "search_aggregator", "client", "async_client",
+        "_is_free_model", "_compact_prompt", "_model_pricing", "_cost_prefetch"
+    )
+
     # Cache & Locks
     _pricing_cache = {}
     _pricing_cache_lock = Lock()
     _pricing_cache_timestamp = 0
+    _pricing_cache_etag = None
+    _pricing_fetch_failed_at = 0
     PRICING_CACHE_TTL = 3600
+    PRICING_RETRY_DELAY = 60
+    PRICING_FALLBACKS = {
+        "google/gemini-2.0-flash-exp:free": {"prompt": 0, "completion": 0},
+        "openai/gpt-4o": {"prompt": 5.0e-6, "completion": 15.0e-6}, # Fixed scaling (per token)
+        "openai/gpt-4o-mini": {"prompt": 0.15e-6, "completion": 0.6e-6}
+    }
 
     def __init__(
         self, 
@@ -47,17 +212,26 @@ class BookSummarizer:
         self.model_name = (model_name or "google/gemini-2.0-flash-exp:free").strip()
         self.provider = provider.capitalize() if provider else "OpenRouter"
         if self.provider == "Openrouter": self.provider = "OpenRouter" # Fix capitalization
+        # model_name is fixed per instance, so resolve free-tier status and rates once
+        self._is_free_model = self.model_name.endswith(":free")
+        # Free-tier models plus any listed in COMPACT_PROMPT_MODELS (comma-separated model id
+        # prefixes, for models that follow the rules without the worked examples) get the
+        # condensed rule block. Read here so values from .env still apply.
+        compact_prefixes = tuple(p.strip() for p in os.environ.get("COMPACT_PROMPT_MODELS", "").split(",") if p.strip())
+        self._compact_prompt = self._is_free_model or self.model_name.startswith(compact_prefixes)
+        self._model_pricing = None
         self.base_url = base_url or "http://localhost:11434"
         self.timeout = timeout
         self.max_retries = max_retries
-        self.currency_manager = CurrencyManager()
-        self._client_lock = Lock()
+        self.currency_manager = get_currency_manager()
+        # Only OpenRouter models can be priced; local Ollama and Groq runs get no estimate
+        billable = not self._is_free_model and self.provider == "OpenRouter"
+        self._cost_prefetch = _COST_POOL.submit(self._prefetch_cost_inputs) if billable else None
         
         # Initialize search aggregator if enabled
         self.search_aggregator = None
         if search_config:
             try:
-                from search_service import create_search_aggregator
                 self.search_aggregator = create_search_aggregator(search_config)
                 if self.search_aggregator:
                     print("[SEARCH] Search enrichment enabled")
@@ -66,40 +240,59 @@ class BookSummarizer:
         
         self._initialize_client()
 
+    def close(self):
+        """Release this instance's SDK clients. The shared connection pools stay open."""
+        self.client = None
+        self.async_client = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def _initialize_client(self):
+        self.client = None
+        # Streaming endpoints use the async client so tokens are read on the event loop
+        self.async_client = None
         try:
+            client_kwargs = None
             if self.provider == "OpenRouter" and self.api_key:
                 # Mask API Key for logging (showing first 4 and last 4)
                 masked_key = f"{self.api_key[:4]}...{self.api_key[-4:]}" if len(self.api_key) > 8 else "***"
                 print(f"[INIT] Initializing OpenRouter client with key: {masked_key} (len={len(self.api_key)})")
                 
-                self.client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=self.api_key,
-                    default_headers={"HTTP-Referer": "http://localhost:5173", "X-Title": "Pustaka+"},
-                    timeout=float(self.timeout),
-                    max_retries=self.max_retries
-                )
+                client_kwargs = {
+                    "base_url": "https://openrouter.ai/api/v1",
+                    "api_key": self.api_key,
+                    "default_headers": {"HTTP-Referer": "http://localhost:5173", "X-Title": "Pustaka+"},
+                    "timeout": float(self.timeout),
+                    "max_retries": self.max_retries
+                }
             elif self.provider == "Groq" and self.api_key:
-                self.client = OpenAI(
-                    base_url="https://api.groq.com/openai/v1",
-                    api_key=self.api_key,
-                    timeout=float(self.timeout),
-                    max_retries=self.max_retries
-                )
+                client_kwargs = {
+                    "base_url": "https://api.groq.com/openai/v1",
+                    "api_key": self.api_key,
+                    "timeout": float(self.timeout),
+                    "max_retries": self.max_retries
+                }
             elif self.provider == "Ollama":
                 self._verify_ollama_connection()
-            else:
-                self.client = None
+
+            if client_kwargs:
+                self.client = OpenAI(http_client=_HTTPX_CLIENT, **client_kwargs)
+                self.async_client = AsyncOpenAI(http_client=_ASYNC_HTTPX_CLIENT, **client_kwargs)
+                _prewarm_connection(client_kwargs["base_url"])
         except Exception as e:
             print(f"[RETRY_INIT] Error during client initialization: {e}")
             self.client = None
+            self.async_client = None
             # Also catch specific error to help user
             self.init_error = str(e)
 
     def _verify_ollama_connection(self):
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = _HTTP.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code != 200:
                 raise BookSummarizerError(f"Ollama error {response.status_code}")
         except requests.exceptions.RequestException as e:
@@ -109,18 +302,23 @@ class BookSummarizer:
     def _extract_metadata(self, book_metadata: List[Dict]) -> Dict[str, str]:
         if not book_metadata: raise BookSummarizerError("Empty metadata")
         primary = book_metadata[0]
-        
-        def get_val(k):
-            for s in book_metadata:
-                if s.get(k): return s.get(k)
-            return ""
 
+        # First non-empty value of each fallback field, gathered in one pass over the sources
+        fallback_keys = ("genre", "publishedDate", "description")
+        found = {}
+        for source in book_metadata:
+            for k in fallback_keys:
+                if k not in found and source.get(k): found[k] = source[k]
+            if len(found) == len(fallback_keys): break
+
+        authors = primary.get("authors", [])
+        year = primary["publishedDate"] if "publishedDate" in primary else found.get("publishedDate", "")
         return {
             "title": summarizer_utils.sanitize_input(primary.get("title", "Unknown"), 200),
-            "author": summarizer_utils.sanitize_input(", ".join(primary.get("authors", [])) if isinstance(primary.get("authors"), list) else str(primary.get("authors", "")), 200),
-            "genre": summarizer_utils.sanitize_input(get_val("genre"), 100),
-            "year": str(primary.get("publishedDate", get_val("publishedDate"))).split("-")[0],
-            "description": get_val("description")
+            "author": summarizer_utils.sanitize_input(", ".join(authors) if isinstance(authors, list) else str(authors), 200),
+            "genre": summarizer_utils.sanitize_input(found.get("genre", ""), 100),
+            "year": str(year).split("-")[0],
+            "description": found.get("description", "")
         }
 
     # --- PROMPT CONSTRUCTION (UPDATED TO 3 SECTIONS) ---
@@ -130,62 +328,99 @@ class BookSummarizer:
                          partial_content: Optional[str] = None, 
                          mode: str = "summarize", 
                          drafts: Optional[List[str]] = None,
-                         search_context: Optional[str] = None) -> str:
+                         search_context: Optional[str] = None,
+                         compact: Optional[bool] = None) -> str:
         
         if not title or not author: raise BookSummarizerError("Missing title/author")
         
         if mode == "judge" and drafts:
             return prompt_templates.build_judge_prompt(title, author, genre, year, drafts)
 
-        return prompt_templates.build_summarize_prompt(title, author, genre, year, context_description, source_note, partial_content, search_context)
+        # Free-tier and COMPACT_PROMPT_MODELS models get the condensed rule examples unless the caller decides
+        if compact is None: compact = self._compact_prompt
+        return prompt_templates.build_summarize_prompt(title, author, genre, year, context_description, source_note, partial_content, search_context, compact)
 
 
     # --- API HELPERS ---
 
     def _summarize_ollama(self, prompt: str, start_time: float) -> Dict:
         try:
-            r = requests.post(f"{self.base_url}/api/generate", json={"model": self.model_name, "prompt": prompt, "stream": False}, timeout=self.timeout)
+            r = _HTTP.post(f"{self.base_url}/api/generate", json={"model": self.model_name, "prompt": prompt, "stream": False}, timeout=self.timeout)
             if r.status_code != 200: return {"error": r.text}
             d = r.json()
             return {
                 "content": summarizer_utils.clean_output(d.get("response", "")),
                 "usage": {"prompt_tokens": d.get("prompt_eval_count", 0), "completion_tokens": d.get("eval_count", 0), "total_tokens": d.get("prompt_eval_count", 0) + d.get("eval_count", 0)},
-                "duration_seconds": round(time.time() - start_time, 2)
+                "duration_seconds": round(time.monotonic() - start_time, 2)
             }
         except Exception as e: return {"error": str(e)}
 
-    def _synthesize_section(self, prompt: str, start_time: float) -> Dict:
+    async def _synthesize_section(self, prompt: str, start_time: float,
+                                  on_tokens: Optional[Callable[[int], Awaitable]] = None) -> Dict:
+        """
+        Generates one synthesized section, streaming it from OpenAI-compatible providers.
+
+        Args:
+            prompt: Section synthesis prompt
+            start_time: Monotonic start of the whole synthesis
+            on_tokens: Awaited with the number of new deltas every SECTION_PROGRESS_EVERY
+                deltas and once at the end, so callers can report progress mid-section
+
+        Returns:
+            {"content", "usage"} or an {"error", "error_type"} dict
+        """
         print(f"[API_CALL] Preparing request. Prompt Length: {len(prompt)} chars...")
         
         for i in range(self.max_retries):
             try:
                 if self.provider == "Ollama": 
-                    res = self._summarize_ollama(prompt, start_time)
+                    res = await anyio.to_thread.run_sync(self._summarize_ollama, prompt, start_time)
                     if "error" in res:
                         print(f"[ERROR_Ollama] {res['error']}")
                     return res
                 
-                if not self.client: return {"error": "No client", "error_type": "ClientError"}
+                if not self.async_client: return {"error": "No client", "error_type": "ClientError"}
                 
-                with self._client_lock:
-                    c = self.client.chat.completions.create(
-                        model=self.model_name, 
-                        messages=[{"role": "user", "content": prompt}], 
-                        temperature=0.7
-                    )
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model_name, 
+                    messages=[{"role": "user", "content": prompt}], 
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
                 
-                u = c.usage
-                content = c.choices[0].message.content
-
-                if not content or len(content.strip()) == 0:
+                parts = []; u = None; pending = 0
+                add_part = parts.append
+                async for chunk in stream:
+                    choices = chunk.choices
+                    if choices:
+                        choice = choices[0]
+                        if c := choice.delta.content:
+                            add_part(c)
+                            pending += 1
+                            if on_tokens and pending >= SECTION_PROGRESS_EVERY:
+                                await on_tokens(pending)
+                                pending = 0
+                        if choice.finish_reason is None:
+                            continue
+                    if chunk.usage:
+                        u = chunk.usage
+                if on_tokens and pending:
+                    await on_tokens(pending)
+                content = "".join(parts)
+
+                if not content or content.isspace():
                     err_msg = "API returned empty content (Possible Filter/Safety refusal)"
                     print(f"[ERROR_CONTENT] {err_msg}")
                     return {"error": err_msg, "error_type": "EmptyContent"}
-                    
-                print(f"[SUCCESS] Received {u.completion_tokens} tokens.")
+                
+                # Providers that ignore include_usage still get counted, if only by deltas
+                usage = ({"prompt_tokens": u.prompt_tokens, "completion_tokens": u.completion_tokens, "total_tokens": u.total_tokens}
+                         if u else {"prompt_tokens": 0, "completion_tokens": len(parts), "total_tokens": len(parts)})
+                print(f"[SUCCESS] Received {usage['completion_tokens']} tokens.")
                 return {
                     "content": summarizer_utils.clean_output(content),
-                    "usage": {"prompt_tokens": u.prompt_tokens, "completion_tokens": u.completion_tokens, "total_tokens": u.total_tokens}
+                    "usage": usage
                 }
             
             except Exception as e:
@@ -195,18 +430,18 @@ class BookSummarizer:
                 if "429" in error_msg or "rate" in error_msg.lower():
                     error_type = "RateLimitError"
                     print(f"[ERROR_API] Rate Limit Hit! Sleeping 5s...")
-                    time.sleep(5)
+                    await anyio.sleep(5)
                 elif "timeout" in error_msg.lower():
                     error_type = "TimeoutError"
                     print(f"[ERROR_API] Timeout. Retrying...")
-                    time.sleep(2)
+                    await anyio.sleep(2)
                 elif "context" in error_msg.lower() or "length" in error_msg.lower():
                     error_type = "ContextLengthError"
                     print(f"[ERROR_API] Prompt too long for model context!")
                     break 
                 else:
                     print(f"[ERROR_API] Generic Error ({i+1}/{self.max_retries}): {error_msg}")
-                    time.sleep(1)
+                    await anyio.sleep(1)
                 
                 if i == self.max_retries - 1: 
                     return {"error": f"Retry failed ({error_type})", "error_type": error_type, "details": error_msg}
@@ -217,17 +452,38 @@ class BookSummarizer:
 
     async def summarize_synthesize(self, title: str, author: str, genre: str, year: str, 
                              drafts: List[str], diversity_analysis: Dict = None, 
-                             search_results: Optional[Dict] = None) -> AsyncGenerator[Dict, None]:
+                             search_results: Optional[Dict] = None, use_cache: bool = True) -> AsyncGenerator[Dict, None]:
         
         print(f"=== STARTING SYNTHESIS for '{title}' ===")
         if not drafts: 
             print("[FATAL] No drafts provided.")
             yield {"error": "No drafts"}; return
         
+        # One draft has nothing to merge: every section would be a single-source rewrite
+        if len(drafts) == 1:
+            usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+            yield {
+                "content": drafts[0], "done": True, "progress": 100,
+                "usage": usage, "model": self.model_name, "provider": self.provider,
+                "cost_estimate": {"total_usd": 0.0, "total_idr": 0, "currency": "USD", "is_free": False}, "duration_seconds": 0.0,
+                "is_synthesized": False, "synthesis_method": "single_draft_passthrough", "draft_count": 1,
+                "synthesis_metadata": {"section_sources": {}, "diversity_score": 0.0}
+            }
+            return
+        
+        # Search results add references to the output, so only plain syntheses are cached
+        cache_key = self._synthesis_cache_key(title, author, genre, year, drafts) if use_cache and not search_results else None
+        if cache_key:
+            cached = await anyio.to_thread.run_sync(get_response_cache().get, cache_key)
+            if cached:
+                print(f"[CACHE] Serving cached synthesis for: {title}")
+                yield {**cached, "duration_seconds": 0.0, "cached": True}
+                return
+        
         diversity_analysis = diversity_analysis or summarizer_utils.calculate_draft_diversity(drafts)
         yield {"status": "Analyzing draft architecture...", "progress": 5}
 
-        start_time = time.time()
+        start_time = time.monotonic()
         all_sections_data = [summarizer_utils.extract_sections(d, prompt_templates.NAME_MAPPINGS) for d in drafts]
         
         section_tasks = []
@@ -252,7 +508,8 @@ class BookSummarizer:
                 "use_full_context": use_full_context, "index": i
             })
 
-        # PARALLEL SYNTHESIS (Maks 3 task sekarang)
+        # PARALLEL SYNTHESIS (Maks 3 task sekarang): one task per section, all awaited on the
+        # event loop through the async client rather than parked in worker threads
         synthesized_sections = {}
         section_metadata = {}
         total_usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
@@ -265,16 +522,14 @@ class BookSummarizer:
             send_stream, receive_stream = anyio.create_memory_object_stream()
             
             async def run_section_synthesis(task):
+                async def report_tokens(n):
+                    await send_stream.send((task, n))
                 try:
-                    hints = {
-                        "EXECUTIVE SUMMARY & CORE THESIS": "Integrasikan Ringkasan Inti, Tesis Utama & Argumen, dan Kutipan Ikonik menjadi satu bagian yang kohesif.",
-                        "ANALYTICAL FRAMEWORK": "Gabungkan Glosarium Terminologi dan Blueprint Penalaran (Celah, Metode, Konvergensi) di sini.",
-                        "MARKET & INTELLECTUAL POSITIONING": "Fokus pada Kompetitor Langsung, USP, dan Warisan Intelektual."
-                    }
                     prompt = prompt_templates.build_section_synthesis_prompt(
-                        task["name"], task["contents"], title, author, genre, year, len(drafts), task["use_full_context"], hints
+                        task["name"], task["contents"], title, author, genre, year, len(drafts), task["use_full_context"],
+                        prompt_templates.SECTION_SYNTHESIS_HINTS
                     )
-                    res = await anyio.to_thread.run_sync(self._synthesize_section, prompt, start_time)
+                    res = await self._synthesize_section(prompt, start_time, report_tokens)
                     await send_stream.send((task, res))
                 except Exception as e:
                     await send_stream.send((task, {"error": str(e), "error_type": "Crash"}))
@@ -282,19 +537,20 @@ class BookSummarizer:
             for task in section_tasks:
                 tg.start_soon(run_section_synthesis, task)
             
-            # Background task to close the stream when all tasks are done
-            async def closer():
-                pass # tg will block anyway, we use receive_stream.receive() in a loop
-            
-            for _ in range(len(section_tasks)):
+            # Sections stream in parallel: token counts arrive as ints between the final results
+            while completed < len(section_tasks):
                 task, res = await receive_stream.receive()
+                if isinstance(res, int):
+                    yield {"status": f"Synthesizing: {task['name']}", "tokens": res}
+                    continue
                 if "error" not in res:
                     synthesized_sections[task["name"]] = res["content"]
                     if "usage" in res:
                         for k in total_usage: total_usage[k] += res["usage"][k]
                     
                     if not task["use_full_context"] and task["contents"]:
-                        sims = [SequenceMatcher(None, c, res["content"]).ratio() for c in task["contents"]]
+                        out = summarizer_utils.shingles(res["content"])
+                        sims = [summarizer_utils.shingle_similarity(summarizer_utils.shingles(c), out) for c in task["contents"]]
                         dom = sims.index(max(sims)) + 1
                         section_metadata[task["name"]] = f"draft_{dom}_dominant" if max(sims) > 0.7 else "merged"
                     else:
@@ -310,8 +566,11 @@ class BookSummarizer:
 
         # RECONSTRUCT DOCUMENT
         final_parts = []
+        by_norm = {}
+        for k in synthesized_sections:
+            by_norm.setdefault(_norm_section(k), k)
         for std_name in prompt_templates.STANDARD_SECTIONS:
-            best_key = next((k for k in synthesized_sections if summarizer_utils.normalize_section_name(k, prompt_templates.NAME_MAPPINGS) == summarizer_utils.normalize_section_name(std_name, prompt_templates.NAME_MAPPINGS)), None)
+            best_key = by_norm.get(_norm_section(std_name))
             if best_key:
                 final_parts.append(f"## {std_name}")
                 final_parts.append(synthesized_sections[best_key])
@@ -334,37 +593,41 @@ class BookSummarizer:
             print(f"[RESCUE MODE] Triggered! Reason: {reason}")
             content = "# SYNTHETIC CONSOLIDATION (FALLBACK)\n\n" + "\n\n".join(drafts[:2])
 
-        yield {
+        result = {
             "content": content, "done": True, "progress": 100,
             "usage": total_usage, "model": self.model_name, "provider": self.provider,
-            "cost_estimate": self._calculate_cost(total_usage.get("prompt_tokens", 0), total_usage.get("completion_tokens", 0)),
-            "duration_seconds": round(time.time() - start_time, 2),
+            "cost_estimate": await self._calculate_cost_async(total_usage.get("prompt_tokens", 0), total_usage.get("completion_tokens", 0)),
+            "duration_seconds": round(time.monotonic() - start_time, 2),
             "is_synthesized": True, "draft_count": len(drafts),
             "synthesis_metadata": {"section_sources": section_metadata, "diversity_score": diversity_analysis.get("diversity_score", 0)}
         }
+        # Partial or fallback output should be retried next time, not replayed
+        if cache_key and not errors_count and len(content) >= 500:
+            await anyio.to_thread.run_sync(get_response_cache().set, cache_key, result)
+        yield result
 
     def _match_section_in_draft(self, target: str, draft_sections: Dict, draft_idx: int) -> Optional[str]:
         if target in draft_sections: return draft_sections[target]
         
-        norm_target = summarizer_utils.normalize_section_name(target, prompt_templates.NAME_MAPPINGS)
+        norm_target = _norm_section(target)
         
         potential_sources = []
         for old_name, new_name in prompt_templates.NAME_MAPPINGS.items():
-            if summarizer_utils.normalize_section_name(new_name, prompt_templates.NAME_MAPPINGS) == norm_target:
+            if _norm_section(new_name) == norm_target:
                 potential_sources.append(old_name)
         
         found_contents = []
         for old_name in potential_sources:
-            norm_old = summarizer_utils.normalize_section_name(old_name, prompt_templates.NAME_MAPPINGS)
+            norm_old = _norm_section(old_name)
             for k, v in draft_sections.items():
-                if summarizer_utils.normalize_section_name(k, prompt_templates.NAME_MAPPINGS) == norm_old:
+                if _norm_section(k) == norm_old:
                     found_contents.append(v)
         
         if found_contents:
             return "\n\n".join(found_contents)
 
         for k, v in draft_sections.items():
-            if summarizer_utils.normalize_section_name(k, prompt_templates.NAME_MAPPINGS) == norm_target: return v
+            if _norm_section(k) == norm_target: return v
             
         return None
 
@@ -398,129 +661,309 @@ class BookSummarizer:
         return "\n".join(lines)
 
 
-    def _calculate_cost(self, p_t: int, c_t: int) -> Dict:
-        if self.model_name.endswith(":free"): return {"total_usd": 0.0, "total_idr": 0, "currency": "USD", "is_free": True}
-        pricing = self._get_pricing_info()
-        if pricing:
-            cost = (p_t * float(pricing.get("prompt", 0))) + (c_t * float(pricing.get("completion", 0)))
+    def _prefetch_cost_inputs(self):
+        """Warms the exchange rate and model rates so the final cost calculation doesn't wait on HTTP."""
+        try:
+            self.currency_manager.get_usd_to_idr_rate()
+            if self._model_pricing is None:
+                self._model_pricing = self._get_pricing_info()
+        except Exception as e:
+            print(f"[PRICING] Cost prefetch failed: {e}")
+
+    def _calculate_cost(self, p_t: int, c_t: int, reported_cost: Optional[float] = None) -> Dict:
+        if self._is_free_model: return {"total_usd": 0.0, "total_idr": 0, "currency": "USD", "is_free": True}
+        if self._cost_prefetch is not None:
+            # Normally finished long before generation ends; don't hold the response if it isn't
+            concurrent.futures.wait([self._cost_prefetch], timeout=COST_PREFETCH_WAIT)
+            self._cost_prefetch = None
+        # OpenRouter bills the request in usage.cost; only fall back to the /models catalogue without it
+        pricing = None
+        if reported_cost is None:
+            if self._model_pricing is None:
+                self._model_pricing = self._get_pricing_info()
+            pricing = self._model_pricing
+        if reported_cost is not None or pricing:
+            if reported_cost is not None:
+                cost = float(reported_cost)
+            else:
+                cost = (p_t * float(pricing.get("prompt", 0))) + (c_t * float(pricing.get("completion", 0)))
             rate = self.currency_manager.get_usd_to_idr_rate() or 15000
             return {"total_usd": round(cost, 6), "total_idr": round(cost*rate), "currency": "USD", "is_free": False}
         return {"total_usd": None, "total_idr": None, "currency": "USD", "is_free": False}
 
+    async def _calculate_cost_async(self, p_t: int, c_t: int, reported_cost: Optional[float] = None) -> Dict:
+        """
+        _calculate_cost() for async paths. Waiting on the cost prefetch, a pricing refresh or
+        an exchange-rate lookup can each block for seconds, so billable models are priced in
+        a worker thread rather than stalling every other stream on the event loop.
+        """
+        if self._is_free_model:
+            return self._calculate_cost(p_t, c_t, reported_cost)
+        return await anyio.to_thread.run_sync(self._calculate_cost, p_t, c_t, reported_cost)
+
     def _get_pricing_info(self) -> Optional[Dict]:
         """Gets pricing info for the current model, fetching from OpenRouter if needed."""
+        # Only OpenRouter has a catalogue (and the fallbacks are OpenRouter ids); skip the lock otherwise
+        if self.provider != "OpenRouter":
+            return None
         now = time.time()
-        
+
+        # Fast path without the lock: a plain dict read once the catalogue is loaded
+        catalogue_fresh = (now - BookSummarizer._pricing_cache_timestamp) < self.PRICING_CACHE_TTL
+        cached = self._pricing_cache.get(self.model_name)
+        if cached is not None and catalogue_fresh:
+            return cached
+        # Another request is already refreshing the catalogue; a stale price beats queueing behind its GET
+        if cached is not None and self._pricing_cache_lock.locked():
+            return cached
+
         with self._pricing_cache_lock:
-            # 1. Check if cache is still valid
-            if (self.model_name in self._pricing_cache and 
-                (now - self._pricing_cache_timestamp) < self.PRICING_CACHE_TTL):
+            # 1. Re-check: another request may have refreshed the catalogue while we waited
+            catalogue_fresh = (now - BookSummarizer._pricing_cache_timestamp) < self.PRICING_CACHE_TTL
+            if self.model_name in self._pricing_cache and catalogue_fresh:
                 return self._pricing_cache[self.model_name]
 
             # 2. Hardcoded fallbacks
-            fb = {
-                "google/gemini-2.0-flash-exp:free": {"prompt": 0, "completion": 0},
-                "openai/gpt-4o": {"prompt": 5.0e-6, "completion": 15.0e-6}, # Fixed scaling (per token)
-                "openai/gpt-4o-mini": {"prompt": 0.15e-6, "completion": 0.6e-6}
-            }
-            if self.model_name in fb:
-                self._pricing_cache[self.model_name] = fb[self.model_name]
-                return fb[self.model_name]
+            if self.model_name in self.PRICING_FALLBACKS:
+                self._pricing_cache[self.model_name] = self.PRICING_FALLBACKS[self.model_name]
+                return self.PRICING_FALLBACKS[self.model_name]
 
             # 3. Dynamic Fetch for OpenRouter
-            if self.provider == "OpenRouter":
+            # (skipped if the catalogue was fetched recently and simply doesn't list this model,
+            # or if the last attempt failed moments ago)
+            recently_failed = (now - BookSummarizer._pricing_fetch_failed_at) < self.PRICING_RETRY_DELAY
+            if self.provider == "OpenRouter" and not catalogue_fresh and not recently_failed:
                 try:
                     print(f"[PRICING] Fetching dynamic pricing from OpenRouter for {self.model_name}...")
-                    response = requests.get("https://openrouter.ai/api/v1/models", timeout=10)
+                    etag = BookSummarizer._pricing_cache_etag
+                    headers = {"If-None-Match": etag} if etag else {}
+                    response = _HTTP.get("https://openrouter.ai/api/v1/models", headers=headers, timeout=(3.05, 10))
+                    if response.status_code == 304:
+                        BookSummarizer._pricing_cache_timestamp = now
+                        return self._pricing_cache.get(self.model_name)
                     if response.status_code == 200:
                         data = response.json()
-                        models = data.get("data", [])
-                        for m in models:
-                            m_id = m.get("id")
-                            p = m.get("pricing")
-                            if m_id and p:
-                                # Store all models in cache while we're at it
-                                self._pricing_cache[m_id] = {
-                                    "prompt": float(p.get("prompt", 0)),
-                                    "completion": float(p.get("completion", 0))
-                                }
-                        
-                        self._pricing_cache_timestamp = now
+                        # Index every model by id in one pass; built aside and swapped in whole so
+                        # lock-free readers never see a half-filled catalogue or delisted models
+                        index = {
+                            m["id"]: {
+                                "prompt": float(p.get("prompt", 0)),
+                                "completion": float(p.get("completion", 0))
+                            }
+                            for m in data.get("data", []) if m.get("id") and (p := m.get("pricing"))
+                        }
+
+                        # Stored on the class: a new BookSummarizer is built per request
+                        BookSummarizer._pricing_cache = index
+                        BookSummarizer._pricing_cache_timestamp = now
+                        BookSummarizer._pricing_cache_etag = response.headers.get("ETag")
                         return self._pricing_cache.get(self.model_name)
+                    print(f"[ERROR] OpenRouter pricing fetch returned {response.status_code}")
                 except Exception as e:
                     print(f"[ERROR] Failed to fetch OpenRouter pricing: {e}")
+                BookSummarizer._pricing_fetch_failed_at = now
 
-        return None
+            # Refresh skipped or failed: an expired entry is still a better estimate than none
+            return self._pricing_cache.get(self.model_name)
+
+    def _response_cache_key(self, m: Dict[str, str], kind: str) -> str:
+        """
+        Cache key for a plain summary of this book with the current model, prompt variant
+        (full or compact rule block) and prompt version.
+
+        Args:
+            m: Metadata from _extract_metadata()
+            kind: Entry shape stored under the key: "summary" for the full result dict
+                (summarize, summarize_async), "stream" for the {"content", "stats"} entries
+                the streaming paths write. Each shape gets its own namespace so one path
+                never reads the other's entry.
+
+        Returns:
+            Response cache key
+        """
+        return ResponseCache.make_key(
+            kind=kind, model=self.model_name, provider=self.provider,
+            title=m["title"].strip().lower(), author=m["author"].strip().lower(),
+            genre=m["genre"], year=m["year"], description=m["description"],
+            search=bool(self.search_aggregator), compact=self._compact_prompt,
+            prompt_version=prompt_templates.__version__
+        )
+
+    def _synthesis_cache_key(self, title: str, author: str, genre: str, year: str, drafts: List[str]) -> str:
+        """Cache key for synthesizing these drafts, in order, with the current model and prompt version."""
+        return ResponseCache.make_key(
+            kind="synthesis", model=self.model_name, provider=self.provider,
+            title=title.strip().lower(), author=author.strip().lower(), genre=genre, year=year,
+            drafts=drafts, prompt_version=prompt_templates.__version__
+        )
+
+    def _search_for_summary(self, m: Dict[str, str]) -> tuple:
+        """Runs search enrichment for a non-streaming summary. Returns (search_results, search_context)."""
+        try:
+            def evaluation_wrapper(results, book_info):
+                return self._evaluate_search_relevance(results, book_info)
+            
+            search_results = self.search_aggregator.search(
+                m["title"], m["author"], m.get("genre", ""),
+                evaluation_wrapper
+            )
+            return search_results, self.search_aggregator.format_for_prompt(search_results)
+        except Exception as e:
+            print(f"[SEARCH_WARNING] Non-streaming search failed: {e}")
+            return {}, None
+
+    def _finish_ollama_summary(self, r: Dict, search_results: Dict) -> Dict:
+        if "content" in r: 
+            r["content"] = summarizer_utils.normalize_output_format(r["content"])
+            # Append references
+            refs_markdown = self._generate_references_markdown(search_results if search_results else {})
+            if refs_markdown:
+                r["content"] += refs_markdown
+        return r
+
+    def _finish_completion_summary(self, c, start: float, search_results: Dict) -> Dict:
+        u = c.usage
+        final_content = summarizer_utils.normalize_output_format(summarizer_utils.clean_output(c.choices[0].message.content))
+        
+        # Append references
+        refs_markdown = self._generate_references_markdown(search_results if search_results else {})
+        if refs_markdown:
+            final_content += refs_markdown
+            
+        res = {
+            "content": final_content,
+            "usage": {"prompt_tokens": u.prompt_tokens, "completion_tokens": u.completion_tokens, "total_tokens": u.total_tokens},
+            "model": self.model_name, "provider": self.provider,
+            "cost_estimate": self._calculate_cost(u.prompt_tokens, u.completion_tokens, getattr(u, "cost", None)),
+            "duration_seconds": round(time.monotonic() - start, 2)
+        }
+        
+        if search_results and search_results.get("search_metadata"):
+            res["search_metadata"] = search_results["search_metadata"]
+            res["search_sources"] = {
+                'brave': [{'title': r['title'], 'url': r['url']} for r in search_results.get('brave_results', [])],
+                'wikipedia': {
+                    'title': search_results.get('wikipedia_summary', '')[:100] + '...',
+                    'url': search_results.get('wikipedia_url', '')
+                } if search_results.get('wikipedia_summary') else None
+            }
+        return res
+
+    def _summarize_with_prompt(self, prompt: str, search_results: Optional[Dict] = None) -> Dict:
+        """
+        Runs one non-streaming completion for a prompt that is already built, with no
+        cache lookup or search. Tournaments build the draft prompt once and fan it out here.
+
+        Args:
+            prompt: Full prompt from _get_full_prompt
+            search_results: Search results to attach as sources, if any
+
+        Returns:
+            Summary dict, or {"error": ...}
+        """
+        try:
+            start = time.monotonic()
+            if self.provider == "Ollama":
+                return self._finish_ollama_summary(self._summarize_ollama(prompt, start), search_results or {})
+            if not self.client: return {"error": "No client"}
+            c = self.client.chat.completions.create(model=self.model_name, messages=[{"role": "user", "content": prompt}])
+            return self._finish_completion_summary(c, start, search_results or {})
+        except Exception as e: return {"error": str(e)}
+
+    async def _summarize_with_prompt_async(self, prompt: str, search_results: Optional[Dict] = None) -> Dict:
+        """Async counterpart of _summarize_with_prompt(): awaits the completion on the event loop."""
+        try:
+            start = time.monotonic()
+            if self.provider == "Ollama":
+                r = await anyio.to_thread.run_sync(self._summarize_ollama, prompt, start)
+                return self._finish_ollama_summary(r, search_results or {})
+            if not self.async_client: return {"error": "No client"}
+            c = await self.async_client.chat.completions.create(model=self.model_name, messages=[{"role": "user", "content": prompt}])
+            # Finishing prices the summary (see _calculate_cost_async), so it runs off the event loop
+            return await anyio.to_thread.run_sync(self._finish_completion_summary, c, start, search_results or {})
+        except Exception as e: return {"error": str(e)}
 
     # --- PUBLIC METHODS (Stream & Summarize Skeletons) ---
     
-    def summarize(self, book_metadata: List[Dict], search_context: Optional[str] = None) -> Dict:
+    def summarize(self, book_metadata: List[Dict], search_context: Optional[str] = None, use_cache: bool = True) -> Dict:
         """Non-streaming summarize"""
         try:
             m = self._extract_metadata(book_metadata)
+
+            # A caller-supplied search context changes the prompt, so only plain requests are cached
+            cache_key = self._response_cache_key(m, "summary") if use_cache and not search_context else None
+            if cache_key:
+                cached = get_response_cache().get(cache_key)
+                if cached:
+                    print(f"[CACHE] Serving cached summary for: {m['title']}")
+                    cached["cached"] = True
+                    return cached
             
             search_results = {}
             if self.search_aggregator and not search_context:
-                try:
-                    def evaluation_wrapper(results, book_info):
-                        return self._evaluate_search_relevance(results, book_info)
-                    
-                    search_results = self.search_aggregator.search(
-                        m["title"], m["author"], m.get("genre", ""),
-                        evaluation_wrapper
-                    )
-                    search_context = self.search_aggregator.format_for_prompt(search_results)
-                except Exception as e:
-                    print(f"[SEARCH_WARNING] Non-streaming search failed: {e}")
+                search_results, search_context = self._search_for_summary(m)
 
             p = self._get_full_prompt(m["title"], m["author"], m["genre"], m["year"], m["description"], "info", search_context=search_context)
             if not p: return {"error": "Prompt failed"}
             
-            start = time.time()
-            if self.provider == "Ollama":
-                r = self._summarize_ollama(p, start)
-                if "content" in r: 
-                    r["content"] = summarizer_utils.normalize_output_format(r["content"])
-                    # Append references
-                    refs_markdown = self._generate_references_markdown(search_results if search_results else {})
-                    if refs_markdown:
-                        r["content"] += refs_markdown
-                return r
-            
-            if not self.client: return {"error": "No client"}
-            with self._client_lock:
-                c = self.client.chat.completions.create(model=self.model_name, messages=[{"role": "user", "content": p}])
-            
-            
-            u = c.usage
-            final_content = summarizer_utils.normalize_output_format(summarizer_utils.clean_output(c.choices[0].message.content))
-            
-            # Append references
-            refs_markdown = self._generate_references_markdown(search_results if search_results else {})
-            if refs_markdown:
-                final_content += refs_markdown
-                
-            res = {
-                "content": final_content,
-                "usage": {"prompt_tokens": u.prompt_tokens, "completion_tokens": u.completion_tokens, "total_tokens": u.total_tokens},
-                "model": self.model_name, "provider": self.provider,
-                "cost_estimate": self._calculate_cost(u.prompt_tokens, u.completion_tokens),
-                "duration_seconds": round(time.time() - start, 2)
-            }
-            
-            
-            if search_results and search_results.get("search_metadata"):
-                res["search_metadata"] = search_results["search_metadata"]
-                res["search_sources"] = {
-                    'brave': [{'title': r['title'], 'url': r['url']} for r in search_results.get('brave_results', [])],
-                    'wikipedia': {
-                        'title': search_results.get('wikipedia_summary', '')[:100] + '...',
-                        'url': search_results.get('wikipedia_url', '')
-                    } if search_results.get('wikipedia_summary') else None
-                }
+            res = self._summarize_with_prompt(p, search_results)
+
+            if cache_key and res.get("content"):
+                get_response_cache().set(cache_key, res)
             return res
         except Exception as e: return {"error": str(e)}
 
+    async def summarize_async(self, book_metadata: List[Dict], search_context: Optional[str] = None, use_cache: bool = True) -> Dict:
+        """Non-streaming summarize that awaits the provider on the event loop instead of a worker thread"""
+        try:
+            m = self._extract_metadata(book_metadata)
+
+            # Same rules and entry shape as summarize(): plain requests only, stored as the result dict
+            cache_key = self._response_cache_key(m, "summary") if use_cache and not search_context else None
+            if cache_key:
+                cached = await anyio.to_thread.run_sync(get_response_cache().get, cache_key)
+                if cached:
+                    print(f"[CACHE] Serving cached summary for: {m['title']}")
+                    cached["cached"] = True
+                    return cached
+
+            search_results = {}
+            if self.search_aggregator and not search_context:
+                search_results, search_context = await anyio.to_thread.run_sync(self._search_for_summary, m)
+
+            p = self._get_full_prompt(m["title"], m["author"], m["genre"], m["year"], m["description"], "info", search_context=search_context)
+            if not p: return {"error": "Prompt failed"}
+
+            res = await self._summarize_with_prompt_async(p, search_results)
+
+            if cache_key and res.get("content"):
+                await anyio.to_thread.run_sync(get_response_cache().set, cache_key, res)
+            return res
+        except Exception as e: return {"error": str(e)}
+
+    async def summarize_batch(self, books: List[List[Dict]], concurrency: int = 8) -> List[Dict]:
+        """
+        Summarizes several books concurrently with this summarizer's model.
+
+        Args:
+            books: One metadata list per book, in the shape summarize() takes
+            concurrency: Maximum number of summaries in flight at once
+
+        Returns:
+            One result dict per book, in input order (failed books carry an "error" key)
+        """
+        results: List[Optional[Dict]] = [None] * len(books)
+        limiter = anyio.Semaphore(max(1, concurrency))
+
+        async def run_one(idx: int, book_metadata: List[Dict]):
+            async with limiter:
+                results[idx] = await self.summarize_async(book_metadata)
+
+        async with anyio.create_task_group() as tg:
+            for idx, book_metadata in enumerate(books):
+                tg.start_soon(run_one, idx, book_metadata)
+        return results
+
     def _evaluate_search_relevance(self, results: List[Dict], book_info: Dict) -> List[str]:
         """
         Uses AI to evaluate the relevance and quality of search results.
@@ -554,7 +997,7 @@ class BookSummarizer:
 RESPONSE ONLY WITH THE JSON OBJECT."""
 
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
             if self.provider == "Ollama":
                 res = self._summarize_ollama(prompt, start_time)
                 content = res.get("content", "{}")
@@ -563,13 +1006,12 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
                     print("[RELEVANCE_EVAL_WARNING] AI client not initialized for evaluation, skipping AI check.")
                     return ["general"] * len(results)
                     
-                with self._client_lock:
-                    c = self.client.chat.completions.create(
-                        model=self.model_name,
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=0.0,
-                        response_format={"type": "json_object"} if "gemini" not in self.model_name.lower() else None
-                    )
+                c = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.0,
+                    response_format={"type": "json_object"} if "gemini" not in self.model_name.lower() else None
+                )
                 content = c.choices[0].message.content
             
             # Parse JSON object
@@ -595,10 +1037,20 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
         # Fallback: mark as general if AI fails
         return ["general"] * len(results)
 
-    async def summarize_stream(self, book_metadata: List[Dict], partial_content: Optional[str] = None) -> AsyncGenerator[str, None]:
+    async def summarize_stream(self, book_metadata: List[Dict], partial_content: Optional[str] = None, use_cache: bool = True) -> AsyncGenerator[str, None]:
         """Streaming summarize"""
         try:
             m = self._extract_metadata(book_metadata)
+
+            # Resumed generations continue a specific partial text, so they are never cached
+            cache_key = self._response_cache_key(m, "stream") if use_cache and not partial_content else None
+            if cache_key:
+                cached = await anyio.to_thread.run_sync(get_response_cache().get, cache_key)
+                if cached:
+                    print(f"[CACHE] Serving cached summary for: {m['title']}")
+                    yield summarizer_utils.sse_event({'content': cached['content']})
+                    yield summarizer_utils.sse_event({**cached['stats'], 'duration_seconds': 0.0, 'cached': True})
+                    return
             
             # Perform search if enabled
             search_context_str = ""
@@ -606,7 +1058,7 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
             search_results = {}
             if self.search_aggregator:
                 print(f"[SEARCH] Starting search for: {m['title']} by {m['author']}")
-                yield f"data: {json.dumps({'status': 'Searching and verifying external sources...', 'progress': 3})}\n\n"
+                yield summarizer_utils.sse_event({'status': 'Searching and verifying external sources...', 'progress': 3})
                 try:
                     # Define a synchronous wrapper for the evaluation callback
                     def evaluation_wrapper(results, book_info):
@@ -637,61 +1089,60 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
                 m["title"], m["author"], m["genre"], m["year"], 
                 m["description"], "info", partial_content, "summarize", None, search_context_str
             )
-            if not p: yield f"data: {json.dumps({'error': 'Prompt failed'})}\n\n"; return
+            if not p: yield summarizer_utils.sse_event({'error': 'Prompt failed'}); return
             
-            start = time.time()
+            start = time.monotonic()
             if self.provider == "Ollama":
-                async for chunk in self._stream_ollama(p, start, search_results):
+                async for chunk in self._stream_ollama(p, start, search_results, cache_key):
                     yield chunk
             else:
-                if not self.client: 
+                if not self.async_client: 
                     err_ext = f" (Init Error: {getattr(self, 'init_error', 'None')})"
-                    yield f"data: {json.dumps({'error': f'No client in summarize_stream{err_ext}'})}\n\n"
+                    yield summarizer_utils.sse_event({'error': f'No client in summarize_stream{err_ext}'})
                     return
                 
-                # OpenAI streaming completion is blocking in its generator, but we can wrap it
-                def get_stream():
-                    with self._client_lock:
-                        return self.client.chat.completions.create(
-                            model=self.model_name, 
-                            messages=[{"role": "user", "content": p}], 
-                            stream=True, 
-                            stream_options={"include_usage": True}
-                        )
-                
-                stream = await anyio.to_thread.run_sync(get_stream)
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model_name, 
+                    messages=[{"role": "user", "content": p}], 
+                    stream=True, 
+                    stream_options={"include_usage": True}
+                )
                 
-                parts = []; usage = None; last_chunk_obj = None
+                parts = []; usage = None; reported_cost = None; finish_reason = None
                 
-                # Iterating over the stream is blocking
-                while True:
-                    try:
-                        chunk = await anyio.to_thread.run_sync(next, stream, None)
-                        if chunk is None: break
-                        
-                        # Store last chunk for citation extraction
-                        last_chunk_obj = chunk
-                        
-                        if hasattr(chunk, 'usage') and chunk.usage: 
-                            usage = {k:getattr(chunk.usage, k) for k in ['prompt_tokens', 'completion_tokens', 'total_tokens']}
-                        
-                        if chunk.choices and chunk.choices[0].delta.content:
-                            c = chunk.choices[0].delta.content
-                            parts.append(c)
-                            yield f"data: {json.dumps({'content': c})}\n\n"
-                    except StopIteration:
-                        break
+                # Per-token hot loop: bind lookups once. Usage only arrives on the closing
+                # chunk (empty choices or a finish_reason), so it isn't checked for every token.
+                # Deltas are coalesced into fewer frames (see ContentCoalescer); the text itself
+                # is only retained when it will be written to the response cache.
+                coalescer = summarizer_utils.ContentCoalescer(); add_part = parts.append; buffer_part = coalescer.add
+                async for chunk in stream:
+                    choices = chunk.choices
+                    if choices:
+                        choice = choices[0]
+                        if c := choice.delta.content:
+                            if cache_key:
+                                add_part(c)
+                            if frame := buffer_part(c):
+                                yield frame
+                        if choice.finish_reason is None:
+                            continue
+                        finish_reason = choice.finish_reason
+                    if u := chunk.usage:
+                        usage = {'prompt_tokens': u.prompt_tokens, 'completion_tokens': u.completion_tokens, 'total_tokens': u.total_tokens}
+                        reported_cost = getattr(u, 'cost', None)
+                if frame := coalescer.flush():
+                    yield frame
 
                 # Append references to common markdown output
                 refs_markdown = self._generate_references_markdown(search_results if search_results else {})
                 if refs_markdown:
-                    yield f"data: {json.dumps({'content': refs_markdown})}\n\n"
+                    yield summarizer_utils.sse_event({'content': refs_markdown})
                 
                 
-                stats = {'done': True, 'duration_seconds': round(time.time()-start, 2), 'model': self.model_name, 'provider': self.provider}
+                stats = {'done': True, 'duration_seconds': round(time.monotonic()-start, 2), 'model': self.model_name, 'provider': self.provider}
                 if usage:
                     stats['usage'] = usage
-                    stats['cost_estimate'] = self._calculate_cost(usage['prompt_tokens'], usage['completion_tokens'])
+                    stats['cost_estimate'] = await self._calculate_cost_async(usage['prompt_tokens'], usage['completion_tokens'], reported_cost)
                 
                 
                 if search_metadata or (search_results and search_results.get("search_metadata")):
@@ -705,40 +1156,55 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
                             'url': search_results.get('wikipedia_url', '')
                         } if search_results.get('wikipedia_summary') else None
                     }
-                yield f"data: {json.dumps(stats)}\n\n"
-        except Exception as e: yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
-    async def _stream_ollama(self, prompt: str, start: float, search_results: Optional[Dict] = None) -> AsyncGenerator[str, None]:
+                # Output cut off at the token limit is left for the resume flow, not replayed
+                if cache_key and parts and finish_reason == "stop":
+                    await anyio.to_thread.run_sync(get_response_cache().set, cache_key, {"content": "".join(parts) + refs_markdown, "stats": stats})
+                yield summarizer_utils.sse_event(stats)
+        except Exception as e: yield summarizer_utils.sse_event({'error': str(e)})
+
+    async def _stream_ollama(self, prompt: str, start: float, search_results: Optional[Dict] = None, cache_key: Optional[str] = None,
+                             prior_usage: Optional[Dict] = None) -> AsyncGenerator[str, None]:
+        """
+        Streams an Ollama generation as SSE frames, ending with a stats frame.
+
+        Args:
+            prompt: Full prompt
+            start: time.monotonic() when the request started, for duration_seconds
+            search_results: Sources to append as references before the stats frame
+            cache_key: Response cache key to store the finished summary under, if any
+            prior_usage: Token counts already spent (e.g. tournament drafts), added to the reported usage
+        """
         try:
-            def make_request():
-                return requests.post(
-                    f"{self.base_url}/api/generate", 
-                    json={"model": self.model_name, "prompt": prompt, "stream": True}, 
-                    stream=True, 
-                    timeout=self.timeout
-                )
-            
-            r = await anyio.to_thread.run_sync(make_request)
-            if r.status_code != 200: yield f"data: {json.dumps({'error': r.text})}\n\n"; return
-            
-            # r.iter_lines is also blocking
-            iterator = r.iter_lines()
-            while True:
-                line = await anyio.to_thread.run_sync(next, iterator, None)
-                if line is None: break
-                
-                if line:
-                    d = json.loads(line.decode('utf-8'))
-                    if d.get("response"): yield f"data: {json.dumps({'content': d['response']})}\n\n"
+            async with _ASYNC_HTTPX_CLIENT.stream(
+                "POST",
+                f"{self.base_url}/api/generate",
+                json={"model": self.model_name, "prompt": prompt, "stream": True},
+                timeout=httpx.Timeout(float(self.timeout), connect=10.0)
+            ) as r:
+                if r.status_code != 200:
+                    await r.aread()
+                    yield summarizer_utils.sse_event({'error': r.text}); return
+
+                # Only retained when the finished text goes to the response cache
+                parts = []
+                coalescer = summarizer_utils.ContentCoalescer()
+                async for d in _aiter_ndjson(r):
+                    if d.get("response"):
+                        if cache_key:
+                            parts.append(d["response"])
+                        if frame := coalescer.add(d["response"]):
+                            yield frame
                     if d.get("done"):
+                        if frame := coalescer.flush():
+                            yield frame
                         # Append references before final stats
                         refs_markdown = self._generate_references_markdown(search_results if search_results else {})
                         if refs_markdown:
-                            yield f"data: {json.dumps({'content': refs_markdown})}\n\n"
+                            yield summarizer_utils.sse_event({'content': refs_markdown})
 
-                        yield f"data: {json.dumps({
+                        stats = {
                             'done': True, 
-                            'duration_seconds': round(time.time()-start, 2), 
+                            'duration_seconds': round(time.monotonic()-start, 2), 
                             'model': self.model_name, 
                             'provider': 'Ollama', 
                             'usage': {
@@ -746,14 +1212,16 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
                                 'completion_tokens': d.get('eval_count', 0), 
                                 'total_tokens': d.get('prompt_eval_count', 0)+d.get('eval_count', 0)
                             }
-                        })}\n\n"
-        except Exception as e: yield f"data: {json.dumps({'error': str(e)})}\n\n"
-
+                        }
+                        if prior_usage:
+                            for k in stats['usage']: stats['usage'][k] += prior_usage.get(k, 0)
+                        if cache_key and parts and d.get("done_reason", "stop") == "stop":
+                            await anyio.to_thread.run_sync(get_response_cache().set, cache_key, {"content": "".join(parts) + refs_markdown, "stats": stats})
+                        yield summarizer_utils.sse_event(stats)
+        except Exception as e: yield summarizer_utils.sse_event({'error': str(e)})
 
-    def elaborate(self, selection: str, query: str, full_context: str = "", history: List[Dict[str, str]] = None) -> Dict:
-        if not selection: 
-            return {"error": "No text selected"}
 
+    def _build_elaborate_prompt(self, selection: str, query: str, full_context: str = "", history: List[Dict[str, str]] = None) -> str:
         selection = summarizer_utils.sanitize_input(selection, 1000)
         query = summarizer_utils.sanitize_input(query, 500)
         full_context = summarizer_utils.sanitize_input(full_context, 5000) if full_context else ""
@@ -766,7 +1234,7 @@ RESPONSE ONLY WITH THE JSON OBJECT."""
             ]
             history_text = "\n".join(formatted_history)
 
-        prompt = f"""<role>
+        return f"""<role>
 You are a SUBJECT MATTER EXPERT and ACADEMIC TUTOR specializing in deep explanation.
 </role>
 
@@ -797,8 +1265,14 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
 5. **Output**: Indonesian.
 </instructions>"""
 
+    def elaborate(self, selection: str, query: str, full_context: str = "", history: List[Dict[str, str]] = None) -> Dict:
+        if not selection: 
+            return {"error": "No text selected"}
+
+        prompt = self._build_elaborate_prompt(selection, query, full_context, history)
+
         try:
-            start_time = time.time()
+            start_time = time.monotonic()
             
             if self.provider == "Ollama":
                 return self._summarize_ollama(prompt, start_time)
@@ -806,11 +1280,10 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
             if not self.client: 
                 return {"error": "AI client not initialized"}
             
-            with self._client_lock:
-                completion = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}]
-                )
+            completion = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}]
+            )
             
             usage = completion.usage
             content = completion.choices[0].message.content
@@ -824,12 +1297,63 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 },
                 "model": self.model_name,
                 "provider": self.provider,
-                "cost_estimate": self._calculate_cost(usage.prompt_tokens, usage.completion_tokens),
-                "duration_seconds": round(time.time() - start_time, 2)
+                "cost_estimate": self._calculate_cost(usage.prompt_tokens, usage.completion_tokens, getattr(usage, "cost", None)),
+                "duration_seconds": round(time.monotonic() - start_time, 2)
             }
         except Exception as e:
             return {"error": f"Elaboration failed: {str(e)}"}
 
+    async def elaborate_stream(self, selection: str, query: str, full_context: str = "", history: List[Dict[str, str]] = None) -> AsyncGenerator[str, None]:
+        """Streaming variant of elaborate(): forwards tokens as SSE events as soon as they arrive"""
+        if not selection:
+            yield summarizer_utils.sse_event({'error': 'No text selected'})
+            return
+
+        prompt = self._build_elaborate_prompt(selection, query, full_context, history)
+        start = time.monotonic()
+
+        try:
+            if self.provider == "Ollama":
+                async for chunk in self._stream_ollama(prompt, start):
+                    yield chunk
+                return
+
+            if not self.async_client:
+                yield summarizer_utils.sse_event({'error': 'AI client not initialized'})
+                return
+
+            stream = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            usage = None; reported_cost = None
+
+            coalescer = summarizer_utils.ContentCoalescer(); buffer_part = coalescer.add
+            async for chunk in stream:
+                choices = chunk.choices
+                if choices:
+                    choice = choices[0]
+                    if c := choice.delta.content:
+                        if frame := buffer_part(c):
+                            yield frame
+                    if choice.finish_reason is None:
+                        continue
+                if u := chunk.usage:
+                    usage = {'prompt_tokens': u.prompt_tokens, 'completion_tokens': u.completion_tokens, 'total_tokens': u.total_tokens}
+                    reported_cost = getattr(u, 'cost', None)
+            if frame := coalescer.flush():
+                yield frame
+
+            stats = {'done': True, 'duration_seconds': round(time.monotonic() - start, 2), 'model': self.model_name, 'provider': self.provider}
+            if usage:
+                stats['usage'] = usage
+                stats['cost_estimate'] = await self._calculate_cost_async(usage['prompt_tokens'], usage['completion_tokens'], reported_cost)
+            yield summarizer_utils.sse_event(stats)
+        except Exception as e:
+            yield summarizer_utils.sse_event({'error': f'Elaboration failed: {str(e)}'})
+
     def summarize_tournament(self, book_metadata: List[Dict], n: int = 3) -> Dict:
         """
         Generate multiple summaries (drafts) concurrently, then synthesize the best one.
@@ -845,6 +1369,9 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
         usage_total = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         durations = []
         
+        # Metadata and the draft prompt are identical for every draft, so build them once
+        m = self._extract_metadata(book_metadata)
+
         # Perform search if enabled
         search_context_str = ""
         search_results = {}
@@ -853,7 +1380,6 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 def evaluation_wrapper(results, book_info):
                     return self._evaluate_search_relevance(results, book_info)
                 
-                m = self._extract_metadata(book_metadata)
                 search_results = self.search_aggregator.search(
                     m["title"], m["author"], m.get("genre", ""),
                     evaluation_wrapper
@@ -862,38 +1388,39 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
             except Exception as e:
                 print(f"[SEARCH_WARNING] Tournament search failed: {e}")
 
+        draft_prompt = self._get_full_prompt(m["title"], m["author"], m["genre"], m["year"], m["description"], "info", search_context=search_context_str)
+        if not draft_prompt:
+            return {"error": "Prompt failed"}
+
         # Phase 1: Generate Drafts Secara Paralel (Format 3 section baru)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=min(n, 3)) as executor:
-            future_to_draft = {executor.submit(self.summarize, book_metadata, search_context_str): i for i in range(n)}
-            
-            for future in concurrent.futures.as_completed(future_to_draft):
-                try:
-                    res = future.result()
-                    if "content" in res:
-                        drafts.append(res["content"])
-                        if "usage" in res:
-                            for k in usage_total: 
-                                usage_total[k] += res["usage"][k]
-                        if "duration_seconds" in res:
-                            durations.append(res["duration_seconds"])
-                except Exception as e:
-                    print(f"Tournament Draft Error: {e}")
-                    continue
+        futures = [_DRAFT_POOL.submit(self._summarize_with_prompt, draft_prompt) for _ in range(n)]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                res = future.result()
+                if "content" in res:
+                    drafts.append(res["content"])
+                    if "usage" in res:
+                        for k in usage_total: 
+                            usage_total[k] += res["usage"][k]
+                    if "duration_seconds" in res:
+                        durations.append(res["duration_seconds"])
+            except Exception as e:
+                print(f"Tournament Draft Error: {e}")
+                continue
 
         if not drafts:
             return {"error": "Failed to generate any drafts"}
 
         # Phase 2: Synthesis (Judge)
         try:
-            metadata = self._extract_metadata(book_metadata)
             judge_prompt = self._get_full_prompt(
-                metadata["title"], metadata["author"], metadata["genre"], 
-                metadata["year"], "", "", 
+                m["title"], m["author"], m["genre"], 
+                m["year"], "", "", 
                 mode="judge", 
                 drafts=drafts
             )
             
-            start_judge = time.time()
+            start_judge = time.monotonic()
             
             if self.provider == "Ollama":
                 judge_res = self._summarize_ollama(judge_prompt, start_judge)
@@ -905,11 +1432,10 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 if not self.client: 
                     raise BookSummarizerError("AI client not initialized")
                 
-                with self._client_lock:
-                    completion = self.client.chat.completions.create(
-                        model=self.model_name,
-                        messages=[{"role": "user", "content": judge_prompt}]
-                    )
+                completion = self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=[{"role": "user", "content": judge_prompt}]
+                )
                 
                 j_usage_obj = completion.usage
                 j_usage = {
@@ -926,7 +1452,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 usage_total[k] += j_usage[k]
             
             avg_duration = sum(durations) / len(durations) if durations else 0
-            duration_judge = round(time.time() - start_judge, 2)
+            duration_judge = round(time.monotonic() - start_judge, 2)
 
             res_content = summarizer_utils.normalize_output_format(final_content)
             
@@ -974,25 +1500,27 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
         Menghasilkan 3 Section Padat.
         """
         if not book_metadata:
-            yield f"data: {json.dumps({'error': 'Empty metadata'})}\n\n"
+            yield summarizer_utils.sse_event({'error': 'Empty metadata'})
             return
 
         drafts = []
         usage_total = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         durations = []
 
-        yield f"data: {json.dumps({'status': f'Generating {n} draft(s) (3-section format)...', 'progress': 5})}\n\n"
+        yield summarizer_utils.sse_event({'status': f'Generating {n} draft(s) (3-section format)...', 'progress': 5})
         
+        # Metadata and the draft prompt are identical for every draft, so build them once
+        m = self._extract_metadata(book_metadata)
+
         # Perform search if enabled for tournament mode as well
         search_context_str = ""
         search_results = {}
         if self.search_aggregator:
-            yield f"data: {json.dumps({'status': 'Searching and verifying external scholarly sources...', 'progress': 7})}\n\n"
+            yield summarizer_utils.sse_event({'status': 'Searching and verifying external scholarly sources...', 'progress': 7})
             try:
                 def evaluation_wrapper(results, book_info):
                     return self._evaluate_search_relevance(results, book_info)
                 
-                m = self._extract_metadata(book_metadata)
                 search_results = await anyio.to_thread.run_sync(
                     self.search_aggregator.search, 
                     m["title"], m["author"], m.get("genre", ""),
@@ -1002,15 +1530,20 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
             except Exception as e:
                 print(f"[SEARCH_WARNING] Tournament search failed: {e}")
 
+        draft_prompt = self._get_full_prompt(m["title"], m["author"], m["genre"], m["year"], m["description"], "info", search_context=search_context_str)
+        if not draft_prompt:
+            yield summarizer_utils.sse_event({'error': 'Prompt failed'})
+            return
+
         # Phase 1: Draft Generation (Concurrent)
         async with anyio.create_task_group() as tg:
             send_stream, receive_stream = anyio.create_memory_object_stream()
             
             async def run_draft(idx):
                 try:
-                    # Pass search_context_str if it exists
-                    search_context = search_context_str if 'search_context_str' in locals() else ""
-                    res = await anyio.to_thread.run_sync(self.summarize, book_metadata, search_context)
+                    # Uncached on purpose: drafts must be independent samples. Awaited on the
+                    # event loop through the shared async pool, so n drafts need no worker threads.
+                    res = await self._summarize_with_prompt_async(draft_prompt)
                     await send_stream.send(res)
                 except Exception as e:
                     await send_stream.send({"error": str(e)})
@@ -1019,8 +1552,29 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 tg.start_soon(run_draft, i)
             
             completed = 0
-            for _ in range(n):
-                res = await receive_stream.receive()
+            received = 0
+            drafting_start = time.monotonic()
+            grace = straggler_deadline = None
+            while received < n:
+                if straggler_deadline is None and n >= 3 and received == n - 1 and len(drafts) == n - 1:
+                    grace = max(STRAGGLER_MIN_WAIT, (time.monotonic() - drafting_start) * STRAGGLER_GRACE_RATIO)
+                    straggler_deadline = time.monotonic() + grace
+                wait = DRAFT_HEARTBEAT_INTERVAL
+                if straggler_deadline is not None:
+                    wait = max(0.0, min(wait, straggler_deadline - time.monotonic()))
+                res = None
+                with anyio.move_on_after(wait):
+                    res = await receive_stream.receive()
+                if res is None:
+                    if straggler_deadline is not None and time.monotonic() >= straggler_deadline:
+                        # The slowest draft would only delay the judge; synthesize from the rest
+                        print(f"[TOURNAMENT] Last draft exceeded {grace:.1f}s grace; judging {len(drafts)} drafts")
+                        tg.cancel_scope.cancel()
+                        break
+                    # Heartbeat so the client (and any proxy) sees the stream is alive during long drafts
+                    yield summarizer_utils.sse_event({'status': f'Drafting... {completed}/{n} complete', 'progress': 5 + int((completed / n) * 60)})
+                    continue
+                received += 1
                 if "content" in res:
                     drafts.append(res["content"])
                     if "usage" in res:
@@ -1029,101 +1583,88 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                     
                     completed += 1
                     progress = 5 + int((completed / n) * 60)
-                    yield f"data: {json.dumps({'status': f'Draft {completed}/{n} completed', 'progress': progress})}\n\n"
+                    yield summarizer_utils.sse_event({'status': f'Draft {completed}/{n} completed', 'progress': progress})
                 else:
                     print(f"Stream Tournament Draft Error: {res.get('error')}")
 
         if not drafts:
-            yield f"data: {json.dumps({'error': 'Failed to generate any drafts'})}\n\n"
+            yield summarizer_utils.sse_event({'error': 'Failed to generate any drafts'})
             return
 
         # Phase 2: Judging/Synthesis (Streaming with Robustness)
         max_attempts = 2
         last_error = None
+        # Same drafts on every attempt, so the judge prompt is built once
+        judge_prompt = self._get_full_prompt(
+            m["title"], m["author"], m["genre"], 
+            m["year"], "", "", 
+            mode="judge", 
+            drafts=drafts
+        )
         
         for attempt in range(max_attempts):
             try:
-                metadata = self._extract_metadata(book_metadata)
-                judge_prompt = self._get_full_prompt(
-                    metadata["title"], metadata["author"], metadata["genre"], 
-                    metadata["year"], "", "", 
-                    mode="judge", 
-                    drafts=drafts
-                )
-                
                 status_msg = 'Synthesizing final artifact...' if attempt == 0 else f'Synthesizing final artifact (Retry {attempt})...'
-                yield f"data: {json.dumps({'status': status_msg, 'progress': 70 + (attempt * 10)})}\n\n"
+                yield summarizer_utils.sse_event({'status': status_msg, 'progress': 70 + (attempt * 10)})
                 
-                start_judge = time.time()
+                start_judge = time.monotonic()
                 
                 if self.provider == "Ollama":
-                    async for chunk in self._stream_ollama(judge_prompt, start_judge, search_results):
-                        if "done" in chunk:
-                            try:
-                                d = json.loads(chunk[6:])
-                                if "usage" in d:
-                                    u = d["usage"]
-                                    for k in usage_total: usage_total[k] += u[k]
-                            except: pass
+                    # Frames pass straight through; the stats frame already reports draft + judge usage
+                    async for chunk in self._stream_ollama(judge_prompt, start_judge, search_results, prior_usage=usage_total):
                         yield chunk
                     return # Success
                 else:
-                    if not self.client:
-                        yield f"data: {json.dumps({'error': 'Client not initialized'})}\n\n"
+                    if not self.async_client:
+                        yield summarizer_utils.sse_event({'error': 'Client not initialized'})
                         return
 
-                    def get_stream():
-                        with self._client_lock:
-                            return self.client.chat.completions.create(
-                                model=self.model_name,
-                                messages=[{"role": "user", "content": judge_prompt}],
-                                stream=True,
-                                stream_options={"include_usage": True}
-                            )
-
-                    stream = await anyio.to_thread.run_sync(get_stream)
+                    stream = await self.async_client.chat.completions.create(
+                        model=self.model_name,
+                        messages=[{"role": "user", "content": judge_prompt}],
+                        stream=True,
+                        stream_options={"include_usage": True}
+                    )
 
-                    content_buffer = []
                     final_usage = None
                     
-                    while True:
-                        try:
-                            chunk = await anyio.to_thread.run_sync(next, stream, None)
-                            if chunk is None: break
-
-                            if hasattr(chunk, 'usage') and chunk.usage:
-                                final_usage = {
-                                    "prompt_tokens": chunk.usage.prompt_tokens,
-                                    "completion_tokens": chunk.usage.completion_tokens,
-                                    "total_tokens": chunk.usage.total_tokens
-                                }
-
-                            if chunk.choices and len(chunk.choices) > 0:
-                                c = chunk.choices[0].delta.content
-                                if c:
-                                    content_buffer.append(c)
-                                    yield f"data: {json.dumps({'content': c})}\n\n"
-                        except StopIteration:
-                            break
+                    coalescer = summarizer_utils.ContentCoalescer(); buffer_part = coalescer.add
+                    async for chunk in stream:
+                        choices = chunk.choices
+                        if choices:
+                            choice = choices[0]
+                            if c := choice.delta.content:
+                                if frame := buffer_part(c):
+                                    yield frame
+                            if choice.finish_reason is None:
+                                continue
+                        if u := chunk.usage:
+                            final_usage = {
+                                "prompt_tokens": u.prompt_tokens,
+                                "completion_tokens": u.completion_tokens,
+                                "total_tokens": u.total_tokens
+                            }
+                    if frame := coalescer.flush():
+                        yield frame
 
                     # Append references
                     refs_markdown = self._generate_references_markdown(search_results if search_results else {})
                     if refs_markdown:
-                        yield f"data: {json.dumps({'content': refs_markdown})}\n\n"
+                        yield summarizer_utils.sse_event({'content': refs_markdown})
 
                     if final_usage:
                         for k in usage_total: 
                             usage_total[k] += final_usage[k]
                     
                     avg_duration = sum(durations) / len(durations) if durations else 0
-                    duration_judge = round(time.time() - start_judge, 2)
+                    duration_judge = round(time.monotonic() - start_judge, 2)
 
                     stats = {
                         'done': True, 'progress': 100,
                         'usage': usage_total,
                         'model': self.model_name,
                         'provider': self.provider,
-                        'cost_estimate': self._calculate_cost(usage_total.get('prompt_tokens', 0), usage_total.get('completion_tokens', 0)),
+                        'cost_estimate': await self._calculate_cost_async(usage_total.get('prompt_tokens', 0), usage_total.get('completion_tokens', 0)),
                         'duration_seconds': round(avg_duration + duration_judge, 2),
                         'is_enhanced': True,
                         'draft_count': len(drafts),
@@ -1138,7 +1679,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                                 'url': search_results.get('wikipedia_url', '')
                             } if search_results.get('wikipedia_summary') else None
                         }
-                    yield f"data: {json.dumps(stats)}\n\n"
+                    yield summarizer_utils.sse_event(stats)
                     return # Success
 
             except Exception as e:
@@ -1148,7 +1689,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                     await anyio.sleep(2) # Brief pause before retry
                 else:
                     # Final attempt fallback to NON-STREAMING if available
-                    yield f"data: {json.dumps({'status': 'Streaming failed. Attempting stable non-streaming synthesis...', 'progress': 90})}\n\n"
+                    yield summarizer_utils.sse_event({'status': 'Streaming failed. Attempting stable non-streaming synthesis...', 'progress': 90})
                     try:
                         if self.provider == "Ollama":
                             # Fallback for Ollama should use its own non-stream logic
@@ -1162,12 +1703,11 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                                 raise BookSummarizerError("AI client not initialized (Fallback)")
                             
                             def run_non_stream():
-                                with self._client_lock:
-                                    return self.client.chat.completions.create(
-                                        model=self.model_name,
-                                        messages=[{"role": "user", "content": judge_prompt}],
-                                        stream=False
-                                    )
+                                return self.client.chat.completions.create(
+                                    model=self.model_name,
+                                    messages=[{"role": "user", "content": judge_prompt}],
+                                    stream=False
+                                )
                             
                             res_obj = await anyio.to_thread.run_sync(run_non_stream)
                             content = res_obj.choices[0].message.content
@@ -1175,7 +1715,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                             for k in usage_total: 
                                 usage_total[k] += getattr(u, k, 0)
                             
-                        yield f"data: {json.dumps({'content': content})}\n\n"
+                        yield summarizer_utils.sse_event({'content': content})
                         stats = {
                             'done': True, 'progress': 100,
                             'usage': usage_total,
@@ -1183,7 +1723,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                             'provider': self.provider,
                             'is_enhanced': True,
                             'is_fallback_used': True,
-                            'duration_seconds': round(time.time() - start_judge, 2)
+                            'duration_seconds': round(time.monotonic() - start_judge, 2)
                         }
                         if search_results and search_results.get("search_metadata"):
                             stats["search_metadata"] = search_results["search_metadata"]
@@ -1194,18 +1734,18 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                                     'url': search_results.get('wikipedia_url', '')
                                 } if search_results.get('wikipedia_summary') else None
                             }
-                        yield f"data: {json.dumps(stats)}\n\n"
+                        yield summarizer_utils.sse_event(stats)
                     except Exception as e2:
-                        yield f"data: {json.dumps({'error': f'All synthesis attempts failed. Last error: {str(e2)}'})}\n\n"
+                        yield summarizer_utils.sse_event({'error': f'All synthesis attempts failed. Last error: {str(e2)}'})
 
     async def summarize_iterative_stream(self, book_metadata: List[Dict], max_iterations: int = 3, target_score: int = 90, critic_model: Optional[str] = None) -> AsyncGenerator[str, None]:
         """
         Iterative Self-Correction Mode:
         Draft -> Critic (Score) -> Refine -> Loop until Target Score or Max Iterations.
         """
-        start_time = time.time()
+        start_time = time.monotonic()
         if not book_metadata:
-            yield f"data: {json.dumps({'error': 'Empty metadata'})}\n\n"
+            yield summarizer_utils.sse_event({'error': 'Empty metadata'})
             return
             
         # 1. Setup & Search
@@ -1213,10 +1753,10 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
         search_context_str = ""
         search_results = {}
         
-        yield f"data: {json.dumps({'status': 'Initializing Iterative Mode...', 'progress': 2})}\n\n"
+        yield summarizer_utils.sse_event({'status': 'Initializing Iterative Mode...', 'progress': 2})
         
         if self.search_aggregator:
-            yield f"data: {json.dumps({'status': 'Searching for high-quality context...', 'progress': 5})}\n\n"
+            yield summarizer_utils.sse_event({'status': 'Searching for high-quality context...', 'progress': 5})
             try:
                 def evaluation_wrapper(results, book_info):
                     return self._evaluate_search_relevance(results, book_info)
@@ -1235,14 +1775,14 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
         usage_total = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
         best_draft = {"content": "", "score": 0, "iteration": 0}
         
-        yield f"data: {json.dumps({'event': 'draft', 'status': 'Generating Initial Draft...', 'progress': 10})}\n\n"
+        yield summarizer_utils.sse_event({'event': 'draft', 'status': 'Generating Initial Draft...', 'progress': 10})
         
         try:
             # First draft using standard summarize
             # We don't stream here because we need the full text for the critic
             res = await anyio.to_thread.run_sync(self.summarize, book_metadata, search_context_str)
             if "error" in res:
-                yield f"data: {json.dumps({'error': f'Initial draft failed: {res["error"]}'})}\n\n"
+                yield summarizer_utils.sse_event({'error': f'Initial draft failed: {res["error"]}'})
                 return
                 
             current_draft = res.get("content", "")
@@ -1252,10 +1792,10 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
             # Initialize best draft
             best_draft = {"content": current_draft, "score": 0, "iteration": 0} # Score unknown yet
             
-            yield f"data: {json.dumps({'event': 'draft_complete', 'content': current_draft, 'progress': 20})}\n\n"
+            yield summarizer_utils.sse_event({'event': 'draft_complete', 'content': current_draft, 'progress': 20})
             
         except Exception as e:
-            yield f"data: {json.dumps({'error': f'Draft generation error: {str(e)}'})}\n\n"
+            yield summarizer_utils.sse_event({'error': f'Draft generation error: {str(e)}'})
             return
 
         # 3. Iteration Loop
@@ -1264,7 +1804,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
         
         for i in range(max_iterations):
             iter_num = i + 1
-            yield f"data: {json.dumps({'event': 'critic_start', 'status': f'Critic analyzing Draft {iter_num}...', 'progress': 20 + (i * 20)})}\n\n"
+            yield summarizer_utils.sse_event({'event': 'critic_start', 'status': f'Critic analyzing Draft {iter_num}...', 'progress': 20 + (i * 20)})
             
             # --- CRITIC PHASE ---
             try:
@@ -1290,25 +1830,25 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                     best_draft = {"content": current_draft, "score": score, "iteration": iter_num}
                 
                 # Emit Score Event
-                yield f"data: {json.dumps({
+                yield summarizer_utils.sse_event({
                     'event': 'score', 
                     'score': score, 
                     'issues': issues, 
                     'fixes': fixes,
                     'iteration': iter_num
-                })}\n\n"
+                })
                 
                 # --- DECISION GATES ---
                 
                 # 1. Target Reached
                 if score >= target_score:
-                    yield f"data: {json.dumps({'event': 'loop_exit', 'reason': 'target_met', 'msg': f'Target score reached ({score})'})}\n\n"
+                    yield summarizer_utils.sse_event({'event': 'loop_exit', 'reason': 'target_met', 'msg': f'Target score reached ({score})'})
                     break
                     
                 # 2. Acceptance Threshold + Minor Issues
                 acceptance_score = target_score - 10 # e.g. 80
                 if score >= acceptance_score and (len(issues) <= 1 or "minor" in str(issues).lower()):
-                    yield f"data: {json.dumps({'event': 'loop_exit', 'reason': 'acceptable', 'msg': 'Acceptable score with minor issues.'})}\n\n"
+                    yield summarizer_utils.sse_event({'event': 'loop_exit', 'reason': 'acceptable', 'msg': 'Acceptable score with minor issues.'})
                     break
                     
                 # 3. Stagnation Guard
@@ -1316,7 +1856,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 if iter_num > 1 and score_delta < 5:
                     stagnation_counter += 1
                     if stagnation_counter >= 2:
-                        yield f"data: {json.dumps({'event': 'loop_exit', 'reason': 'stagnation', 'msg': 'Score stagnation detected.'})}\n\n"
+                        yield summarizer_utils.sse_event({'event': 'loop_exit', 'reason': 'stagnation', 'msg': 'Score stagnation detected.'})
                         break
                 else:
                     stagnation_counter = 0
@@ -1325,11 +1865,11 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 
                 # 4. Max Iterations Reached (Check loop end)
                 if i == max_iterations - 1:
-                     yield f"data: {json.dumps({'event': 'loop_exit', 'reason': 'max_iter', 'msg': 'Max iterations reached.'})}\n\n"
+                     yield summarizer_utils.sse_event({'event': 'loop_exit', 'reason': 'max_iter', 'msg': 'Max iterations reached.'})
                      break
                 
                 # --- REFINEMENT PHASE ---
-                yield f"data: {json.dumps({'event': 'refine_start', 'status': f'Refining Draft {iter_num}...', 'progress': 25 + (i * 20)})}\n\n"
+                yield summarizer_utils.sse_event({'event': 'refine_start', 'status': f'Refining Draft {iter_num}...', 'progress': 25 + (i * 20)})
                 
                 refine_prompt = prompt_templates.build_refiner_prompt(m["title"], m["author"], current_draft, issues, fixes)
                 
@@ -1342,19 +1882,19 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                     if "usage" in refine_res:
                          for k in usage_total: usage_total[k] += refine_res["usage"][k]
                          
-                    yield f"data: {json.dumps({'event': 'refine_complete', 'content': current_draft})}\n\n"
+                    yield summarizer_utils.sse_event({'event': 'refine_complete', 'content': current_draft})
                 else:
-                    yield f"data: {json.dumps({'error': 'Refinement produced empty content'})}\n\n"
+                    yield summarizer_utils.sse_event({'error': 'Refinement produced empty content'})
                     break # Stop if refinement fails
                     
             except Exception as e:
                 print(f"[ITERATION_ERROR] {e}")
                 # Use best draft so far
-                yield f"data: {json.dumps({'error': f'Iteration error: {str(e)}. Returning best result.'})}\n\n"
+                yield summarizer_utils.sse_event({'error': f'Iteration error: {str(e)}. Returning best result.'})
                 break
 
         # 4. Final Finalization
-        yield f"data: {json.dumps({'status': 'Finalizing...', 'progress': 95})}\n\n"
+        yield summarizer_utils.sse_event({'status': 'Finalizing...', 'progress': 95})
         
         final_content = best_draft["content"]
         
@@ -1367,15 +1907,15 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
             final_content += refs_markdown
             
         # Yield the final polished content to replace whatever is in the frontend
-        yield f"data: {json.dumps({'event': 'refine_complete', 'content': final_content})}\n\n"
+        yield summarizer_utils.sse_event({'event': 'refine_complete', 'content': final_content})
 
         stats = {
             'done': True, 'progress': 100,
             'usage': usage_total,
             'model': self.model_name,
             'provider': self.provider,
-            'cost_estimate': self._calculate_cost(usage_total.get('prompt_tokens', 0), usage_total.get('completion_tokens', 0)),
-            'duration_seconds': round(time.time() - start_time, 2),
+            'cost_estimate': await self._calculate_cost_async(usage_total.get('prompt_tokens', 0), usage_total.get('completion_tokens', 0)),
+            'duration_seconds': round(time.monotonic() - start_time, 2),
             'is_enhanced': True,
             'draft_count': iter_num,
             'final_score': best_draft["score"],
@@ -1392,7 +1932,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                 } if search_results.get('wikipedia_summary') else None
             }
             
-        yield f"data: {json.dumps(stats)}\n\n"
+        yield summarizer_utils.sse_event(stats)
 
 
     async def _evaluate_draft_quality(self, title: str, author: str, draft: str, model_override: Optional[str] = None) -> Dict:
@@ -1424,7 +1964,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
     async def _run_completion(self, prompt: str, model: str = None, temperature: float = 0.7, json_mode: bool = False) -> Dict:
         """Helper for async completion"""
         model = model or self.model_name
-        start = time.time()
+        start = time.monotonic()
         
         if self.provider == "Ollama":
              # We can't easily use model_override with Ollama properly without verifying it exists, 
@@ -1435,7 +1975,7 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
                  if json_mode: req_json["format"] = "json"
                  
                  r = await anyio.to_thread.run_sync(
-                     lambda: requests.post(f"{self.base_url}/api/generate", json=req_json, timeout=self.timeout)
+                     lambda: _HTTP.post(f"{self.base_url}/api/generate", json=req_json, timeout=self.timeout)
                  )
                  if r.status_code != 200: return {"error": r.text}
                  d = r.json()
@@ -1448,16 +1988,15 @@ User Question: "{query if query else 'Jelaskan konsep ini lebih detail dan berik
              if not self.client: return {"error": "No client"}
              
              def call_api():
-                 with self._client_lock:
-                     params = {
-                         "model": model,
-                         "messages": [{"role": "user", "content": prompt}],
-                         "temperature": temperature
-                     }
-                     if json_mode and "gemini" not in model.lower(): # Gemini via OpenAI compat sometimes dislikes this param
-                         params["response_format"] = {"type": "json_object"}
+                 params = {
+                     "model": model,
+                     "messages": [{"role": "user", "content": prompt}],
+                     "temperature": temperature
+                 }
+                 if json_mode and "gemini" not in model.lower(): # Gemini via OpenAI compat sometimes dislikes this param
+                     params["response_format"] = {"type": "json_object"}
                          
-                     return self.client.chat.completions.create(**params)
+                 return self.client.chat.completions.create(**params)
              
              c = await anyio.to_thread.run_sync(call_api)
              u = c.usage
@@ -0,0 +1,42 @@
+import concurrent.futures
+import time
+import unittest
+from unittest import mock
+
+import anyio
+
+import summarizer
+from summarizer import BookSummarizer
+
+
+class AsyncCostEstimateTest(unittest.TestCase):
+    def test_pending_prefetch_does_not_block_the_event_loop(self):
+        s = BookSummarizer(api_key="test-key", model_name="paid/model", provider="Groq")
+        s._cost_prefetch = concurrent.futures.Future()  # never completes
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await anyio.sleep(0.02)
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(ticker)
+                cost = await s._calculate_cost_async(100, 50)
+                tg.cancel_scope.cancel()
+            return cost
+
+        with mock.patch.object(summarizer, "COST_PREFETCH_WAIT", 0.3):
+            cost = anyio.run(main)
+        self.assertFalse(cost["is_free"])
+        # The loop kept running for the whole wait instead of freezing on it
+        self.assertGreater(len(ticks), 5)
+
+    def test_free_model_is_priced_inline(self):
+        s = BookSummarizer(api_key="test-key", model_name="some/model:free", provider="OpenRouter")
+        self.assertTrue(anyio.run(s._calculate_cost_async, 100, 50)["is_free"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from unittest import mock
+
+import anyio
+
+import summarizer
+from summarizer import BookSummarizer
+
+
+class PrewarmTest(unittest.TestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch.dict(summarizer._PREWARMED_AT, clear=True),
+            mock.patch.object(summarizer._ASYNC_HTTPX_CLIENT, "head", new_callable=mock.AsyncMock),
+            mock.patch.object(summarizer._HTTPX_CLIENT, "head"),
+        ]
+        self.async_head, self.sync_head = [p.start() for p in patchers][1:]
+        for p in patchers:
+            self.addCleanup(p.stop)
+
+    def test_summarizer_built_on_event_loop_warms_async_pool(self):
+        async def build():
+            BookSummarizer(api_key="test-key", model_name="test/model", provider="Groq")
+            await anyio.sleep(0)
+        anyio.run(build)
+        self.async_head.assert_awaited_once_with("https://api.groq.com/openai/v1/models", timeout=5.0)
+        self.sync_head.assert_not_called()
+
+    def test_prewarm_is_skipped_within_keepalive_window(self):
+        async def build_two():
+            BookSummarizer(api_key="test-key", model_name="test/model", provider="Groq")
+            BookSummarizer(api_key="test-key", model_name="test/model", provider="Groq")
+            await anyio.sleep(0)
+        anyio.run(build_two)
+        self.assertEqual(self.async_head.await_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from prompts.builders import _clip_fragment, build_summarize_prompt
+
+
+class ClipFragmentTest(unittest.TestCase):
+    def test_short_text_is_unchanged(self):
+        self.assertEqual(_clip_fragment("short text.", 20), "short text.")
+
+    def test_cuts_at_paragraph_break(self):
+        text = "First paragraph here.\n\nSecond paragraph that runs on"
+        self.assertEqual(_clip_fragment(text, 40), "First paragraph here...")
+
+    def test_cuts_at_line_break(self):
+        text = "- first bullet item\n- second bullet item runs on"
+        self.assertEqual(_clip_fragment(text, 35), "- first bullet item...")
+
+    def test_cuts_at_sentence_break_without_doubling_the_period(self):
+        text = "One sentence here. Another sentence follows and runs on"
+        clipped = _clip_fragment(text, 30)
+        self.assertEqual(clipped, "One sentence here...")
+        self.assertFalse(clipped.endswith("...."))
+
+    def test_cuts_at_word_break(self):
+        self.assertEqual(_clip_fragment("alpha beta gamma delta epsilon", 20), "alpha beta gamma...")
+
+    def test_never_ends_with_four_dots(self):
+        for sep in ("\n\n", "\n", ". ", " "):
+            text = sep.join(["Sentence number one."] * 6)
+            self.assertFalse(_clip_fragment(text, 50).endswith("...."), repr(sep))
+
+    def test_hard_cut_without_any_break(self):
+        self.assertEqual(_clip_fragment("x" * 30, 10), "x" * 10 + "...")
+
+    def test_ignores_breaks_in_the_first_half(self):
+        # The only space is before limit // 2, so the budget is used in full
+        self.assertEqual(_clip_fragment("ab " + "y" * 30, 20), "ab " + "y" * 17 + "...")
+
+
+class SummarizePromptTest(unittest.TestCase):
+    def test_description_is_clipped(self):
+        prompt = build_summarize_prompt("T", "A", "g", "2000", "Kalimat pertama. " * 60, "info")
+        line = next(l for l in prompt.splitlines() if l.startswith("Description"))
+        self.assertTrue(line.endswith("pertama..."))
+        self.assertLessEqual(len(line.split(": ", 1)[1]), 503)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+from search_service import BraveSearchClient, SearchAggregator
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, count=1):
+        self._count = count
+
+    def json(self):
+        return {"web": {"results": [{"title": "t", "description": "d", "url": f"https://example.org/{i}"}
+                                    for i in range(self._count)]}}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _FakeWikiResponse:
+    status_code = 200
+
+    def __init__(self, params):
+        self._params = params
+
+    def json(self):
+        if self._params.get("list") == "search":
+            return {"query": {"search": [{"title": self._params["srsearch"]}]}}
+        title = self._params["titles"]
+        return {"query": {"pages": {"1": {"extract": f"About {title}", "fullurl": "https://id.wikipedia.org/x"}}}}
+
+
+class _CountingSession:
+    """Records the most requests that were ever in flight at once."""
+
+    def __init__(self, respond=lambda params: _FakeResponse()):
+        self._lock = threading.Lock()
+        self._respond = respond
+        self.active = 0
+        self.peak = 0
+
+    def get(self, *args, params=None, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        return self._respond(params)
+
+
+class BraveConcurrencyTest(unittest.TestCase):
+    def test_requests_run_one_at_a_time_by_default(self):
+        client = BraveSearchClient(api_key="test-key")
+        client._session = _CountingSession()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda q: client.search(q), ["a", "b", "c", "d"]))
+        self.assertTrue(all(r["total"] == 1 for r in results))
+        self.assertEqual(client._session.peak, 1)
+
+
+class RelevanceEvaluationTest(unittest.TestCase):
+    def test_results_are_evaluated_in_one_call(self):
+        aggregator = SearchAggregator(brave_api_key="test-key", enable_wikipedia=False, max_results=10)
+        aggregator.brave_client._session = SimpleNamespace(get=lambda *args, **kwargs: _FakeResponse(10))
+        calls = []
+
+        def evaluator(results, book_info):
+            calls.append(len(results))
+            return ["general"] * len(results)
+        res = aggregator.search("Title", "Author", relevance_evaluator=evaluator)
+        self.assertEqual(calls, [10])
+        self.assertEqual(len(res["brave_results"]), 10)
+
+
+class SearchManyTest(unittest.TestCase):
+    def setUp(self):
+        self.aggregator = SearchAggregator(brave_api_key="test-key")
+        self.aggregator.brave_client._session = _CountingSession()
+        self.aggregator.wiki_client._session = _CountingSession(_FakeWikiResponse)
+
+    def test_books_fan_out_while_brave_stays_serial(self):
+        books = [{"title": f"Book {i}", "author": "Author"} for i in range(4)]
+        results = self.aggregator.search_many(books)
+        self.assertEqual([r["wikipedia_summary"] for r in results],
+                         [f'About "Book {i}" OR "Author"' for i in range(4)])
+        self.assertGreater(self.aggregator.wiki_client._session.peak, 1)
+        self.assertEqual(self.aggregator.brave_client._session.peak, 1)
+
+    def test_failed_book_gets_error_entry(self):
+        search = SearchAggregator.search
+
+        def flaky(self_, title, *args):
+            if title == "Bad":
+                raise RuntimeError("boom")
+            return search(self_, title, *args)
+        with mock.patch.object(SearchAggregator, "search", flaky):
+            results = self.aggregator.search_many([{"title": "Good", "author": "A"}, {"title": "Bad", "author": "B"}])
+        self.assertIn("brave_results", results[0])
+        self.assertEqual(results[1], {"error": "Search failed: boom"})
+
+    def test_empty_batch(self):
+        self.assertEqual(self.aggregator.search_many([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import orjson
+
+import storage_manager
+from storage_manager import StorageManager
+
+
+class _StorageTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.data_file = os.path.join(tmp.name, "data", "saved_summaries.json")
+        self.log_file = os.path.join(tmp.name, "data", "changes.log")
+        for name, path in (("DATA_FILE", self.data_file),
+                           ("LOG_FILE", self.log_file),
+                           ("COVERS_DIR", os.path.join(tmp.name, "covers"))):
+            patcher = mock.patch.object(storage_manager, name, path)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.storage = self._open()
+
+    def _open(self) -> StorageManager:
+        storage = StorageManager()
+        self.addCleanup(self._close, storage)
+        return storage
+
+    @staticmethod
+    def _close(storage: StorageManager):
+        if not storage._log_fd.closed:
+            storage.flush()
+            storage._log_fd.close()
+
+    def _reopen(self) -> StorageManager:
+        self._close(self.storage)
+        self.storage = self._open()
+        return self.storage
+
+    def _save(self, title="Snapshot Book", isbn="123", content="Body"):
+        return self.storage.save_summary({
+            "title": title,
+            "author": "A. Writer",
+            "summary_content": content,
+            "metadata": {"isbn": isbn},
+        })
+
+
+class SnapshotTest(_StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.variant = self._save()
+
+    def test_snapshot_not_changed_by_later_writes(self):
+        snapshot = self.storage.get_all_summaries()
+        book_id = snapshot[0]["id"]
+
+        note = self.storage.add_note_to_summary(self.variant["id"], {"content": "first"})
+        self.storage.update_note_in_summary(self.variant["id"], note["id"], {"content": "edited", "extra": 1})
+        self.storage.update_book_metadata(book_id, "Renamed", "A. Writer", "123", genre="History")
+
+        self.assertEqual(snapshot[0]["title"], "Snapshot Book")
+        self.assertEqual(snapshot[0]["genre"], "")
+        self.assertEqual(snapshot[0]["summaries"][0]["notes"], [])
+
+        second = self.storage.get_all_summaries()
+        self.storage.update_note_in_summary(self.variant["id"], note["id"], {"content": "again", "more": 2})
+        self.assertEqual(second[0]["summaries"][0]["notes"][0]["content"], "edited")
+        self.assertNotIn("more", second[0]["summaries"][0]["notes"][0])
+        self.assertEqual(self.storage.get_all_summaries()[0]["summaries"][0]["notes"][0]["content"], "again")
+
+    def test_write_results_are_snapshots(self):
+        book_id = self.storage.get_all_summaries()[0]["id"]
+        note = self.storage.add_note_to_summary(self.variant["id"], {"content": "first"})
+        updated_note = self.storage.update_note_in_summary(self.variant["id"], note["id"], {"content": "edited"})
+        book = self.storage.update_book_metadata(book_id, "Renamed", "A. Writer", "123")
+
+        self.storage.update_note_in_summary(self.variant["id"], note["id"], {"content": "again", "more": 2})
+        self.storage.update_book_metadata(book_id, "Renamed Twice", "A. Writer", "123", genre="History")
+        self.storage.update_summary_content(self.variant["id"], "New body")
+
+        self.assertEqual(note["content"], "first")
+        self.assertEqual(updated_note["content"], "edited")
+        self.assertNotIn("more", updated_note)
+        self.assertEqual(book["title"], "Renamed")
+        self.assertEqual(book["genre"], "")
+        self.assertEqual(book["summaries"][0]["notes"][0]["content"], "edited")
+        self.assertEqual(self.variant["summary_content"], "Body")
+
+
+class ChangeLogTest(_StorageTestCase):
+    def _state(self):
+        return [
+            (b["title"], b.get("genre"), [(v["summary_content"], [n["content"] for n in v.get("notes", [])])
+                                          for v in b["summaries"]])
+            for b in self.storage.get_all_summaries()
+        ]
+
+    def _populate(self):
+        first = self._save("First Book", "111")
+        second = self._save("Second Book", "222")
+        self._save("Third Book", "333")
+        note = self.storage.add_note_to_summary(first["id"], {"content": "note"})
+        self.storage.update_note_in_summary(first["id"], note["id"], {"content": "edited note"})
+        self.storage.update_summary_content(first["id"], "First body, revised")
+        book_id = next(b["id"] for b in self.storage.get_all_summaries() if b["title"] == "Second Book")
+        self.storage.update_book_metadata(book_id, "Second Book", "A. Writer", "222", genre="History")
+        self.storage.delete_summary(second["id"])
+        return first
+
+    def test_reopen_replays_change_log(self):
+        self._populate()
+        before = self._state()
+        self.assertGreater(os.path.getsize(self.log_file), 0)
+        # Nothing has been folded into the snapshot yet; the log carries every write
+        with open(self.data_file, "rb") as f:
+            self.assertEqual(orjson.loads(f.read()), [])
+
+        self._reopen()
+        self.assertEqual(self._state(), before)
+        self.assertEqual([t for t, _, _ in before], ["First Book", "Third Book"])
+
+    def test_compaction_folds_log_into_snapshot(self):
+        self._populate()
+        before = self._state()
+        self.storage._compact()
+
+        self.assertEqual(os.path.getsize(self.log_file), 0)
+        with open(self.data_file, "rb") as f:
+            self.assertEqual([b["title"] for b in orjson.loads(f.read())], ["First Book", "Third Book"])
+        self._reopen()
+        self.assertEqual(self._state(), before)
+
+    def test_compaction_starts_once_log_outgrows_snapshot(self):
+        with mock.patch.object(storage_manager, "COMPACTION_MIN_BYTES", 0):
+            self._save()
+            deadline = time.monotonic() + 5
+            while self.storage._compacting and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertFalse(self.storage._compacting)
+        self.assertEqual(os.path.getsize(self.log_file), 0)
+        self._reopen()
+        self.assertEqual([t for t, _, _ in self._state()], ["Snapshot Book"])
+
+    def test_torn_tail_is_truncated_on_reopen(self):
+        first = self._populate()
+        before = self._state()
+        self._close(self.storage)
+        complete = os.path.getsize(self.log_file)
+        with open(self.log_file, "ab") as f:
+            f.write(b'{"op":"delete_book","book_id":"')
+
+        self._reopen()
+        self.assertEqual(self._state(), before)
+        self.assertEqual(os.path.getsize(self.log_file), complete)
+
+        # New events start on a clean line instead of being glued to the torn one
+        self.storage.add_note_to_summary(first["id"], {"content": "after crash"})
+        self._reopen()
+        self.assertEqual(self._state()[0][2][0][1], ["edited note", "after crash"])
+
+    def test_corrupt_entry_is_skipped(self):
+        self._save("First Book", "111")
+        with open(self.log_file, "ab") as f:
+            f.write(b"not json\n")
+        self._save("Second Book", "222")
+
+        self._reopen()
+        self.assertEqual([t for t, _, _ in self._state()], ["Second Book", "First Book"])
+
+
+if __name__ == "__main__":
+    unittest.main()
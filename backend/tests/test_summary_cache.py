@@ -0,0 +1,151 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import anyio
+import orjson
+
+import summarizer
+from response_cache import ResponseCache
+from summarizer import BookSummarizer
+
+BOOK = [{"title": "Cache Test Book", "authors": ["A. Writer"], "genre": "History", "publishedDate": "2001"}]
+
+
+class _FakeStream:
+    """Async iterator over OpenAI-style stream chunks: one content delta, then usage."""
+
+    def __init__(self, text, finish_reason="stop"):
+        self._chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text), finish_reason=None)], usage=None),
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=finish_reason)],
+                            usage=SimpleNamespace(prompt_tokens=3, completion_tokens=1, total_tokens=4, cost=None)),
+        ]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        return self._chunks.pop(0)
+
+
+def _fake_async_client(text, finish_reason="stop"):
+    async def create(**kwargs):
+        return _FakeStream(text, finish_reason)
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _frames(sse_chunks):
+    return [orjson.loads(c[len("data: "):]) for c in sse_chunks]
+
+
+class SummaryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(os.path.join(self._tmp.name, "cache.db"))
+        patcher = mock.patch.object(summarizer, "get_response_cache", return_value=self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.s = BookSummarizer(api_key="test-key", model_name="test/model", provider="Groq")
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def _stream(self, text="streamed summary", finish_reason="stop", use_cache=True):
+        self.s.async_client = _fake_async_client(text, finish_reason)
+
+        async def collect():
+            return [chunk async for chunk in self.s.summarize_stream(BOOK, use_cache=use_cache)]
+        return _frames(anyio.run(collect))
+
+    def test_entry_kinds_use_separate_keys(self):
+        m = self.s._extract_metadata(BOOK)
+        self.assertNotEqual(self.s._response_cache_key(m, "summary"), self.s._response_cache_key(m, "stream"))
+
+    def test_stream_ignores_summary_written_by_summarize(self):
+        result = {"content": "sync summary", "usage": {}, "model": "test/model"}
+        with mock.patch.object(BookSummarizer, "_summarize_with_prompt", return_value=result):
+            self.assertEqual(self.s.summarize(BOOK)["content"], "sync summary")
+
+        frames = self._stream()
+        self.assertFalse(any("error" in f for f in frames), frames)
+        self.assertEqual("".join(f.get("content", "") for f in frames), "streamed summary")
+        self.assertTrue(frames[-1]["done"])
+
+    def test_summarize_ignores_entry_written_by_stream(self):
+        self._stream()
+        # A second stream is served from its own entry
+        replay = self._stream("not used")
+        self.assertEqual(replay[0]["content"], "streamed summary")
+        self.assertTrue(replay[-1]["cached"])
+
+        result = {"content": "sync summary", "usage": {}, "model": "test/model"}
+        with mock.patch.object(BookSummarizer, "_summarize_with_prompt", return_value=result):
+            res = self.s.summarize(BOOK)
+        self.assertEqual(res["content"], "sync summary")
+        self.assertNotIn("cached", res)
+
+    def test_batch_summary_does_not_break_a_later_stream(self):
+        result = {"content": "batch summary", "usage": {}, "model": "test/model"}
+
+        async def fake_summarize(self_, prompt, search_results=None):
+            return result
+        with mock.patch.object(BookSummarizer, "_summarize_with_prompt_async", fake_summarize):
+            batch = anyio.run(self.s.summarize_batch, [BOOK])
+        self.assertEqual(batch[0]["content"], "batch summary")
+
+        frames = self._stream()
+        self.assertFalse(any("error" in f for f in frames), frames)
+        self.assertEqual("".join(f.get("content", "") for f in frames), "streamed summary")
+
+    def test_summarize_async_skips_cache_with_search_context(self):
+        calls = []
+
+        async def fake_summarize(self_, prompt, search_results=None):
+            calls.append(prompt)
+            return {"content": "summary", "usage": {}}
+        with mock.patch.object(BookSummarizer, "_summarize_with_prompt_async", fake_summarize):
+            anyio.run(self.s.summarize_async, BOOK)
+            res = anyio.run(self.s.summarize_async, BOOK, "<search_results>ctx</search_results>")
+        self.assertEqual(len(calls), 2)
+        self.assertNotIn("cached", res)
+        self.assertIn("ctx", calls[1])
+
+    def test_regenerate_bypasses_cached_stream(self):
+        self._stream()
+        # "Generate Ulang" sends bypass_cache, which main passes through as use_cache=False
+        fresh = self._stream("regenerated summary", use_cache=False)
+        self.assertEqual("".join(f.get("content", "") for f in fresh), "regenerated summary")
+        self.assertNotIn("cached", fresh[-1])
+
+    def test_truncated_stream_is_not_cached(self):
+        self._stream("cut off mid", finish_reason="length")
+        frames = self._stream()
+        self.assertEqual("".join(f.get("content", "") for f in frames), "streamed summary")
+        self.assertNotIn("cached", frames[-1])
+
+    def test_key_tracks_prompt_variant_and_version(self):
+        m = self.s._extract_metadata(BOOK)
+        full = self.s._response_cache_key(m, "summary")
+        self.s._compact_prompt = True
+        compact = self.s._response_cache_key(m, "summary")
+        self.assertNotEqual(full, compact)
+        with mock.patch.object(summarizer.prompt_templates, "__version__", "0.0.0-test"):
+            self.assertNotEqual(self.s._response_cache_key(m, "summary"), compact)
+
+    def test_compact_prompt_models_changes_key(self):
+        m = self.s._extract_metadata(BOOK)
+        before = self.s._response_cache_key(m, "summary")
+        with mock.patch.dict(os.environ, {"COMPACT_PROMPT_MODELS": "other/, test/"}):
+            listed = BookSummarizer(api_key="test-key", model_name="test/model", provider="Groq")
+        self.assertTrue(listed._compact_prompt)
+        self.assertNotEqual(listed._response_cache_key(m, "summary"), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
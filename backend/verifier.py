@@ -1,6 +1,12 @@
-import requests
 from typing import Dict, Optional, List, Tuple
 
+from http_utils import create_session
+from storage_manager import get_storage_manager
+from cache_manager import CacheManager
+
+# A verifier is built per request; share one keep-alive pool for Google Books / Open Library
+_HTTP = create_session(8, retries=2)
+
 class BookVerifier:
     def __init__(self):
         self.google_books_url = "https://www.googleapis.com/books/v1/volumes"
@@ -26,7 +32,7 @@ class BookVerifier:
         params["maxResults"] = 1
         
         try:
-            response = requests.get(self.google_books_url, params=params)
+            response = _HTTP.get(self.google_books_url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 if "items" in data and len(data["items"]) > 0:
@@ -68,7 +74,7 @@ class BookVerifier:
         # If ISBN is strictly provided, we can search by that.
         
         try:
-            response = requests.get(self.open_library_url, params=params)
+            response = _HTTP.get(self.open_library_url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 if "docs" in data and len(data["docs"]) > 0:
@@ -112,10 +118,7 @@ class BookVerifier:
         Checks local storage and cache first, then external APIs.
         Returns: (is_verified, info_sources, message, status)
         """
-        from storage_manager import StorageManager
-        from cache_manager import CacheManager
-        
-        storage_manager = StorageManager()
+        storage_manager = get_storage_manager()
         cache_manager = CacheManager()
         
         # 1. Check Saved Library (StorageManager)
@@ -189,7 +192,7 @@ class BookVerifier:
         # 1. Google Books
         try:
             params = {"q": query, "maxResults": 5}
-            response = requests.get(self.google_books_url, params=params)
+            response = _HTTP.get(self.google_books_url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 for item in data.get("items", []):
@@ -208,7 +211,7 @@ class BookVerifier:
         # 2. Open Library
         try:
             params = {"q": query, "limit": 5}
-            response = requests.get(self.open_library_url, params=params)
+            response = _HTTP.get(self.open_library_url, params=params)
             if response.status_code == 200:
                 data = response.json()
                 for item in data.get("docs", []):
@@ -698,7 +698,8 @@ function App() {
         enhance_quality: highQuality,
         draft_count: highQuality ? draftCount : 1,
         iterative_mode: iterativeMode,
-        critic_model: criticModel === 'same' ? null : criticModel
+        critic_model: criticModel === 'same' ? null : criticModel,
+        bypass_cache: force
       }, abortControllerRef.current.signal);
 
       if (!response.ok) {
@@ -746,7 +747,7 @@ function App() {
                 }
                 accumulatedSummary += data.content;
                 setSummary(accumulatedSummary);
-                tokenCount += 1;
+                tokenCount += data.tokens || 1;
                 setTokensReceived(tokenCount);
               }
 
@@ -892,6 +893,10 @@ function App() {
                 setProgress(data.progress);
               }
 
+              if (data.tokens) {
+                setTokensReceived(prev => prev + data.tokens);
+              }
+
               if (data.content) {
                 accumulatedSummary += data.content;
                 setSummary(accumulatedSummary);